@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from ..models import RawLead
+
+# Only these fields feed the score; name/email/phone never change the result
+SCORING_FIELDS = ("move_date", "origin_zip", "destination_zip", "home_size", "budget", "urgency")
+
+def cache_key(lead: RawLead) -> str:
+    """Content hash of the normalized scoring-relevant lead fields"""
+    normalized = {
+        field: " ".join(str(getattr(lead, field)).lower().split())
+        for field in SCORING_FIELDS
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ScoreCache:
+    """
+    Two-tier cache of AI scoring results.
+
+    An in-process LRU (bounded by ``max_size``) sits in front of an optional
+    SQLite file shared across restarts. Both tiers expire entries after
+    ``ttl`` seconds; the SQLite tier is additionally trimmed to ``max_rows``.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 86400, path: Optional[str] = None, max_rows: int = 100000):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path:
+            # Shared by every worker process; wait out a concurrent writer
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS score_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(value)
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM score_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.disk_hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: dict):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, dict(value), expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO score_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    self._trim_disk()
+
+    def _remember(self, key: str, value: dict, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_disk(self):
+        self._db.execute("DELETE FROM score_cache WHERE expires_at <= ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM score_cache WHERE key NOT IN "
+            "(SELECT key FROM score_cache ORDER BY expires_at DESC LIMIT ?)",
+            (self.max_rows,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM score_cache")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+score_cache = ScoreCache(
+    max_size=int(os.getenv("SCORE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("SCORE_CACHE_TTL", "86400")),
+    path=os.getenv("SCORE_CACHE_PATH") or None,
+)
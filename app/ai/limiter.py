@@ -0,0 +1,88 @@
+import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from ..shared import per_worker
+
+# Shared budget for every OpenAI call made by the server. With several
+# worker processes each one enforces an equal share of it.
+OPENAI_MAX_CONCURRENCY = per_worker(int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+OPENAI_TOKENS_PER_MINUTE = per_worker(int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "90000")))
+
+class RateLimiter:
+    """
+    Caps concurrent OpenAI requests and the estimated tokens spent per minute.
+
+    Concurrency is a plain semaphore; the token budget is a bucket that refills
+    continuously at ``tokens_per_minute / 60`` tokens per second. A limiter
+    with a ``parent`` also holds a slot and budget of the parent, so it can
+    only narrow the parent's limits, never widen them.
+    """
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int, parent: Optional["RateLimiter"] = None):
+        self.parent = parent
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        rate = self.tokens_per_minute / 60.0
+        self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    async def _take(self, tokens: int):
+        # A single request can never need more than a full bucket
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                deficit = tokens - self._tokens
+                await asyncio.sleep(deficit / (self.tokens_per_minute / 60.0))
+
+    async def acquire(self, tokens: int):
+        """Wait for a concurrency slot and ``tokens`` of budget; pair with `release`"""
+        await self._semaphore.acquire()
+        try:
+            await self._take(tokens)
+            if self.parent is not None:
+                await self.parent.acquire(tokens)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def try_acquire(self, tokens: int) -> bool:
+        """Like `acquire`, but only if a slot and the budget are free right now"""
+        needed = min(tokens, self.tokens_per_minute)
+        if self._semaphore.locked() or self._lock.locked():
+            return False
+        self._refill()
+        if self._tokens < needed:
+            return False
+        if self.parent is not None and not await self.parent.try_acquire(tokens):
+            return False
+        # An unlocked semaphore is acquired without yielding to the loop
+        await self._semaphore.acquire()
+        self._tokens -= needed
+        return True
+
+    def release(self):
+        if self.parent is not None:
+            self.parent.release()
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def limit(self, tokens: int):
+        """Hold a concurrency slot and spend ``tokens`` from the budget"""
+        await self.acquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
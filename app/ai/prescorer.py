@@ -0,0 +1,137 @@
+import os
+import re
+import logging
+from datetime import date
+from typing import Optional, Tuple
+from ..models import RawLead
+
+logger = logging.getLogger(__name__)
+
+# Leads scoring at or below JUNK / at or above HOT skip the LLM entirely
+FASTPATH_ENABLED = os.getenv("FASTPATH_ENABLED", "true").lower() == "true"
+FASTPATH_JUNK_THRESHOLD = int(os.getenv("FASTPATH_JUNK_THRESHOLD", "25"))
+FASTPATH_HOT_THRESHOLD = int(os.getenv("FASTPATH_HOT_THRESHOLD", "85"))
+
+EMPTY_BUDGETS = {"", "0", "none", "n/a", "na", "unknown", "-", "?"}
+HIGH_URGENCY = ("asap", "immediate", "urgent", "high", "now")
+MEDIUM_URGENCY = ("soon", "medium", "moderate", "month")
+LOW_URGENCY = ("flexible", "low", "whenever", "not sure", "no rush")
+
+stats = {"fast_path": 0, "escalated": 0}
+
+def parse_budget(budget: str) -> Optional[float]:
+    """Parse free-text budgets like '$5,000', '5k' or '3000-4000' (lower bound)"""
+    text = budget.lower().replace(",", "").replace("$", "")
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(k)?", text)
+    if not match:
+        return None
+    amount = float(match.group(1))
+    return amount * 1000 if match.group(2) else amount
+
+def parse_bedrooms(home_size: str) -> Optional[int]:
+    text = home_size.lower()
+    if "studio" in text:
+        return 1
+    match = re.search(r"(\d+)", text)
+    return int(match.group(1)) if match else None
+
+def _urgency_points(urgency: str) -> int:
+    text = urgency.lower()
+    if any(word in text for word in HIGH_URGENCY):
+        return 30
+    if any(word in text for word in MEDIUM_URGENCY):
+        return 18
+    if any(word in text for word in LOW_URGENCY):
+        return 6
+    return 12
+
+def _timing_points(days_until_move: int) -> int:
+    if days_until_move <= 14:
+        return 25
+    if days_until_move <= 45:
+        return 18
+    if days_until_move <= 120:
+        return 10
+    return 4
+
+def _size_points(bedrooms: Optional[int]) -> int:
+    if bedrooms is None:
+        return 10
+    return {1: 8, 2: 12, 3: 18, 4: 22}.get(bedrooms, 25 if bedrooms > 4 else 8)
+
+def _budget_points(amount: Optional[float]) -> int:
+    if amount is None:
+        return 8
+    if amount >= 10000:
+        return 20
+    if amount >= 5000:
+        return 15
+    if amount >= 2000:
+        return 10
+    return 5
+
+def prescore(lead: RawLead, today: Optional[date] = None) -> Tuple[int, str]:
+    """
+    Deterministic rule-based score (0-100) with a short reasoning string.
+
+    Disqualifying signals (past move date, same origin and destination zip,
+    no budget) short-circuit to a junk score; otherwise urgency, timing, home
+    size and budget each contribute points.
+    """
+    today = today or date.today()
+    days_until_move = (lead.move_date - today).days
+
+    if days_until_move < 0:
+        return 5, "Move date has already passed."
+    if lead.origin_zip.strip() == lead.destination_zip.strip():
+        return 10, "Origin and destination zip are identical."
+    if lead.budget.strip().lower() in EMPTY_BUDGETS:
+        return 10, "No budget provided."
+
+    bedrooms = parse_bedrooms(lead.home_size)
+    budget = parse_budget(lead.budget)
+    score = (
+        _urgency_points(lead.urgency)
+        + _timing_points(days_until_move)
+        + _size_points(bedrooms)
+        + _budget_points(budget)
+    )
+    size = f"{bedrooms}BR" if bedrooms else "unknown size"
+    budget_text = f"${budget:,.0f}" if budget is not None else "unclear budget"
+    reasoning = (
+        f"Rule-based score: {size} move in {days_until_move} days, "
+        f"urgency '{lead.urgency}', {budget_text}."
+    )
+    return score, reasoning
+
+def fast_path(lead: RawLead) -> Optional[dict]:
+    """
+    Return a score without calling OpenAI when the lead is obviously junk or
+    obviously hot, or None to escalate an ambiguous lead to the LLM.
+    """
+    if not FASTPATH_ENABLED:
+        return None
+
+    score, reasoning = prescore(lead)
+    if score <= FASTPATH_JUNK_THRESHOLD or score >= FASTPATH_HOT_THRESHOLD:
+        stats["fast_path"] += 1
+        return {"score": score, "reasoning": reasoning}
+
+    stats["escalated"] += 1
+    return None
+
+def fallback_score(lead: RawLead) -> dict:
+    """Rule-based score for any lead, used when OpenAI is failing or unreachable"""
+    score, reasoning = prescore(lead)
+    return {"score": score, "reasoning": f"{reasoning} AI scoring unavailable; rule-based estimate."}
+
+def fast_path_stats() -> dict:
+    total = stats["fast_path"] + stats["escalated"]
+    return {
+        "enabled": FASTPATH_ENABLED,
+        "junk_threshold": FASTPATH_JUNK_THRESHOLD,
+        "hot_threshold": FASTPATH_HOT_THRESHOLD,
+        "fast_path": stats["fast_path"],
+        "escalated": stats["escalated"],
+        "escalation_rate": stats["escalated"] / total if total else 0.0,
+    }
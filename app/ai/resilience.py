@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+class OverloadedError(Exception):
+    """Raised instead of calling an upstream when no local capacity frees up in time"""
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream once too many recent calls have failed.
+
+    Closed: calls flow and their outcomes fill a rolling window of the last
+    ``window`` calls. Once at least ``min_calls`` are recorded and the failure
+    ratio reaches ``error_threshold`` the breaker opens and every call is
+    rejected for ``cooldown`` seconds. It then goes half-open and lets a single
+    probe through: success closes it, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window: int = 20, error_threshold: float = 0.5, min_calls: int = 10, cooldown: float = 30.0):
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self._opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            self._probe_at = None
+        if self.state == self.CLOSED:
+            return True
+        # A probe that never reported back (e.g. cancelled) is replaced after a cooldown
+        if self.state == self.HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+            self._probe_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, success: bool):
+        if self.state == self.HALF_OPEN:
+            self._close() if success else self._open()
+        elif self.state == self.CLOSED:
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+
+    def _close(self):
+        self.state = self.CLOSED
+        self._outcomes.clear()
+
+    def stats(self) -> dict:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "open": self.state != self.CLOSED,
+            "error_rate": self._outcomes.count(False) / calls if calls else 0.0,
+            "window_calls": calls,
+            "times_opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+class LatencyTracker:
+    """Rolling sample of the most recent call latencies"""
+
+    def __init__(self, size: int = 1000):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self) -> dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+
+        def rank(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+
+        return {"count": self.count, "p50_ms": rank(0.50), "p95_ms": rank(0.95), "p99_ms": rank(0.99)}
+
+async def hedged(
+    attempt: Callable[[], Awaitable],
+    hedge_after: Optional[float],
+    max_attempts: int,
+    retryable: Callable[[Exception], bool] = lambda e: True,
+    hedge: Optional[Callable[[], Awaitable[Optional[asyncio.Future]]]] = None,
+):
+    """
+    Run ``attempt()`` with hedging and retries; the first success wins.
+
+    If no attempt has finished after ``hedge_after`` seconds a duplicate is
+    started alongside it, and a retryable failure starts a replacement
+    immediately, up to ``max_attempts`` in total. Remaining attempts are
+    cancelled once one succeeds. Non-retryable errors propagate at once;
+    otherwise the last error is raised when every attempt has failed.
+    Bound the whole thing with ``asyncio.wait_for`` for a deadline.
+
+    With ``hedge``, duplicates come from ``await hedge()`` instead: it
+    returns a started task, or None when there is no capacity for one right
+    now, in which case the hedge is tried again ``hedge_after`` later.
+    """
+    tasks = set()
+    last_error: Optional[Exception] = None
+
+    def launch():
+        tasks.add(asyncio.ensure_future(attempt()))
+
+    launch()
+    started = 1
+    try:
+        while tasks:
+            can_hedge = hedge_after and started < max_attempts
+            done, _ = await asyncio.wait(
+                tasks, timeout=hedge_after if can_hedge else None, return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                if hedge is None:
+                    launch()
+                else:
+                    task = await hedge()
+                    if task is None:
+                        continue
+                    tasks.add(task)
+                started += 1
+                continue
+            for task in done:
+                tasks.discard(task)
+                error = task.exception()
+                if error is None:
+                    return task.result()
+                if not retryable(error):
+                    raise error
+                last_error = error
+            if not tasks and started < max_attempts:
+                launch()
+                started += 1
+        raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
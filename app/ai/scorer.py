@@ -1,20 +1,71 @@
 import os
 import json
+import asyncio
 import logging
-from openai import AsyncOpenAI
+import time
+from typing import Dict, List, Optional
+from ..clients import LazyClient
 from ..models import RawLead
+from .limiter import OPENAI_MAX_CONCURRENCY, OPENAI_TOKENS_PER_MINUTE, RateLimiter
+from .cache import score_cache, cache_key
+from .prescorer import fast_path, fallback_score
+from .resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, OverloadedError, hedged
 
 logger = logging.getLogger(__name__)
 
-client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# Per-attempt timeout and overall deadline (seconds) for one scoring call.
+# Retries are ours (hedged below), not the SDK's.
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "6"))
+OPENAI_DEADLINE = float(os.getenv("OPENAI_DEADLINE", "10"))
+# Start a duplicate request when the first is slower than this (0 disables)
+OPENAI_HEDGE_AFTER = float(os.getenv("OPENAI_HEDGE_AFTER", "2.5"))
+OPENAI_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", "2"))
+# Longest a single-lead call waits for a limiter slot before the rule-based
+# score is used instead (batches queue for as long as they need)
+OPENAI_QUEUE_TIMEOUT = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "5"))
 
-async def analyze_lead(lead: RawLead) -> dict:
-    """
-    Analyzes a moving lead using OpenAI to determine a quality score (0-100)
-    and provides reasoning.
-    """
-    prompt = f"""
-    You are an expert AI lead scorer for the moving industry. 
+def _create_openai():
+    # Imported here: the openai SDK is the single largest import of the app
+    import httpx
+    from openai import AsyncOpenAI
+
+    # One keep-alive pool sized for every concurrent attempt, hedges included
+    connections = OPENAI_MAX_CONCURRENCY * OPENAI_MAX_ATTEMPTS
+    return AsyncOpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        timeout=OPENAI_TIMEOUT,
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            timeout=OPENAI_TIMEOUT,
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        ),
+    )
+
+client = LazyClient("openai", _create_openai, lambda c: c.close())
+
+# Switch to the rule-based scorer when too many recent calls fail
+breaker = CircuitBreaker(
+    window=int(os.getenv("OPENAI_BREAKER_WINDOW", "20")),
+    error_threshold=float(os.getenv("OPENAI_BREAKER_THRESHOLD", "0.5")),
+    min_calls=int(os.getenv("OPENAI_BREAKER_MIN_CALLS", "10")),
+    cooldown=float(os.getenv("OPENAI_BREAKER_COOLDOWN", "30")),
+)
+latency = LatencyTracker()
+stats = {"calls": 0, "attempts": 0, "failures": 0, "fallbacks": 0}
+
+# Leads packed into one OpenAI request by analyze_leads (1 = one request per lead)
+OPENAI_PACK_SIZE = int(os.getenv("OPENAI_PACK_SIZE", "10"))
+
+# Rough allowance for the JSON reply when estimating a request's token cost
+RESPONSE_TOKENS = 60
+
+OPENAI_MODEL = "gpt-3.5-turbo" # or gpt-4 if available/preferred
+
+limiter = RateLimiter(OPENAI_MAX_CONCURRENCY, OPENAI_TOKENS_PER_MINUTE)
+
+def build_prompt(lead: RawLead) -> str:
+    return f"""
+    You are an expert AI lead scorer for the moving industry.
     Analyze the following lead and assign a score between 0 and 100 based on the likelihood of booking and potential value.
     Provide a brief reasoning for the score.
 
@@ -34,21 +85,308 @@ async def analyze_lead(lead: RawLead) -> dict:
     }}
     """
 
+# Sent once per packed request instead of once per lead
+PACKED_SYSTEM_PROMPT = (
+    "Score moving-industry leads 0-100 by likelihood of booking and job value. "
+    "Input: JSON array of leads {id,date,from,to,size,budget,urgency}. "
+    'Reply with JSON {"results":[{"id":<id>,"score":<0-100>,"reasoning":"<one short sentence>"}]} '
+    "with exactly one entry per input lead."
+)
+
+def compact_lead(index: int, lead: RawLead) -> dict:
+    """Scoring fields only, under short keys; names and contact details never reach the model"""
+    return {
+        "id": index,
+        "date": lead.move_date.isoformat(),
+        "from": lead.origin_zip,
+        "to": lead.destination_zip,
+        "size": lead.home_size,
+        "budget": lead.budget,
+        "urgency": lead.urgency,
+    }
+
+def build_packed_messages(leads: List[RawLead]) -> List[dict]:
+    payload = json.dumps([compact_lead(i, lead) for i, lead in enumerate(leads)], separators=(",", ":"))
+    return [
+        {"role": "system", "content": PACKED_SYSTEM_PROMPT},
+        {"role": "user", "content": payload},
+    ]
+
+def parse_packed(content: str, count: int) -> Dict[int, dict]:
+    """
+    Map a packed reply back to lead indexes.
+
+    Only well-formed entries are returned: an integer id in range (first
+    occurrence wins), a numeric score within 0-100 and a string reasoning.
+    Anything else is dropped so the caller can re-score those leads alone.
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    items = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return {}
+
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index, score, reasoning = item.get("id"), item.get("score"), item.get("reasoning")
+        if isinstance(index, str) and index.isdigit():
+            index = int(index)
+        if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < count or index in results:
+            continue
+        result = _valid_result(score, reasoning)
+        if result is not None:
+            results[index] = result
+    return results
+
+def _valid_result(score, reasoning) -> Optional[dict]:
+    """A numeric score within 0-100 (rounded to an int) and a string reasoning, or None"""
+    if not isinstance(score, (int, float)) or isinstance(score, bool) or not 0 <= score <= 100:
+        return None
+    if not isinstance(reasoning, str):
+        return None
+    return {"score": int(round(score)), "reasoning": reasoning}
+
+def parse_single(content: str) -> dict:
+    """
+    Validate a one-lead reply; raises ValueError if it is not a usable
+    score, so a malformed reply is never cached or served.
+    """
+    data = json.loads(content)
+    result = _valid_result(data.get("score"), data.get("reasoning")) if isinstance(data, dict) else None
+    if result is None:
+        raise ValueError(f"Malformed OpenAI score: {content[:200]}")
+    return result
+
+def estimate_tokens(prompt: str) -> int:
+    """Cheap token estimate (~4 characters per token) for rate limiting"""
+    return len(prompt) // 4 + RESPONSE_TOKENS
+
+def _retryable(error: Exception) -> bool:
+    import openai
+
+    # Not RateLimitError: an immediate retry of a 429 only fails again
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+async def _complete(
+    messages: List[dict],
+    tokens: int,
+    limiter: RateLimiter,
+    queue_timeout: Optional[float] = None,
+) -> str:
+    """
+    One chat completion under the limiter, breaker, deadline and hedging.
+
+    Raises CircuitOpenError without calling OpenAI (or waiting for the
+    limiter) while the breaker is open, and OverloadedError when no limiter
+    slot frees up within ``queue_timeout`` seconds (None waits as long as it
+    takes). The limiter slot is taken before the deadline starts, so time spent
+    queueing behind other calls is never mistaken for a slow upstream. The
+    first attempt and its retries run in that slot; a hedge starts only when
+    a second slot and its token budget are free at once, so hedging can
+    never push us past the concurrency or token limits.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("OpenAI circuit breaker is open")
+    try:
+        await asyncio.wait_for(limiter.acquire(tokens), queue_timeout)
+    except asyncio.TimeoutError:
+        raise OverloadedError(f"No OpenAI capacity within {queue_timeout:g}s") from None
+    try:
+        async def attempt() -> str:
+            stats["attempts"] += 1
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                temperature=0.2,
+                response_format={"type": "json_object"}
+            )
+            return response.choices[0].message.content
+
+        async def hedge() -> Optional[asyncio.Future]:
+            if not await limiter.try_acquire(tokens):
+                return None
+            task = asyncio.ensure_future(attempt())
+            task.add_done_callback(lambda _: limiter.release())
+            return task
+
+        stats["calls"] += 1
+        start = time.perf_counter()
+        try:
+            content = await asyncio.wait_for(
+                hedged(attempt, OPENAI_HEDGE_AFTER, OPENAI_MAX_ATTEMPTS, _retryable, hedge),
+                OPENAI_DEADLINE,
+            )
+        except Exception:
+            stats["failures"] += 1
+            breaker.record(False)
+            raise
+        finally:
+            latency.observe(time.perf_counter() - start)
+        breaker.record(True)
+        return content
+    finally:
+        limiter.release()
+
+def _fallback(lead: RawLead) -> dict:
+    stats["fallbacks"] += 1
+    return fallback_score(lead)
+
+def ai_stats() -> dict:
+    return {
+        **stats,
+        "breaker": breaker.stats(),
+        "latency": latency.percentiles(),
+        "deadline_seconds": OPENAI_DEADLINE,
+        "hedge_after_seconds": OPENAI_HEDGE_AFTER,
+    }
+
+async def request_score(
+    lead: RawLead,
+    limiter: RateLimiter = limiter,
+    queue_timeout: Optional[float] = None,
+) -> dict:
+    """
+    Score a lead with OpenAI under the rate limiter. Raises on any failure.
+
+    Obvious junk/hot leads are answered by the rule-based fast path, and
+    results are cached by the lead's scoring fields, so duplicate submissions
+    and re-imported leads skip the OpenAI call entirely. While the circuit
+    breaker is open, or no limiter slot frees up within ``queue_timeout``,
+    the rule-based fallback score is returned (uncached).
+    """
+    quick = fast_path(lead)
+    if quick is not None:
+        return quick
+
+    key = cache_key(lead)
+    cached = score_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        result = await _score_one(lead, limiter, queue_timeout)
+    except (CircuitOpenError, OverloadedError):
+        return _fallback(lead)
+    score_cache.set(key, result)
+    return result
+
+async def _score_one(lead: RawLead, limiter: RateLimiter, queue_timeout: Optional[float] = None) -> dict:
+    """One OpenAI request for one lead"""
+    prompt = build_prompt(lead)
+    content = await _complete([{"role": "user", "content": prompt}], estimate_tokens(prompt), limiter, queue_timeout)
+    return parse_single(content)
+
+async def request_pack(leads: List[RawLead], limiter: RateLimiter = limiter) -> list:
+    """
+    Score several leads with a single OpenAI request.
+
+    Returns one entry per lead, in input order: the scoring dict or the
+    exception raised for that lead. Leads the reply omits or garbles (or all
+    of them, if the request itself fails) are re-scored one request each.
+    Fast path and cache are the caller's job; results are cached here.
+    """
+    messages = build_packed_messages(leads)
+    prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+    results = {}
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo", # or gpt-4 if available/preferred
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            response_format={"type": "json_object"}
+        content = await _complete(messages, prompt_tokens + RESPONSE_TOKENS * len(leads), limiter)
+        results = parse_packed(content, len(leads))
+    except CircuitOpenError:
+        return [_fallback(lead) for lead in leads]
+    except Exception as e:
+        logger.warning(f"Packed scoring of {len(leads)} leads failed: {e}")
+
+    missing = [i for i in range(len(leads)) if i not in results]
+    if missing:
+        logger.warning(f"Re-scoring {len(missing)} of {len(leads)} packed leads individually")
+        fallback = await asyncio.gather(
+            *(_score_one(leads[i], limiter) for i in missing),
+            return_exceptions=True,
         )
-        
-        content = response.choices[0].message.content
-        result = json.loads(content)
-        return result
+        results.update(zip(missing, fallback))
+
+    for i, lead in enumerate(leads):
+        if isinstance(results[i], CircuitOpenError):
+            results[i] = _fallback(lead)
+        elif not isinstance(results[i], Exception):
+            score_cache.set(cache_key(lead), results[i])
+    return [results[i] for i in range(len(leads))]
+
+async def analyze_lead(lead: RawLead) -> dict:
+    """
+    Analyzes a moving lead using OpenAI to determine a quality score (0-100)
+    and provides reasoning.
+    """
+    try:
+        return await request_score(lead, queue_timeout=OPENAI_QUEUE_TIMEOUT)
     except Exception as e:
         logger.error(f"AI Scoring Error: {e}")
         # Fallback in case of AI failure
-        return {
-            "score": 50, 
-            "reasoning": "AI scoring failed. Manual review recommended."
-        }
+        return _fallback(lead)
+
+async def analyze_leads(
+    leads: List[RawLead],
+    max_concurrency: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+    pack_size: Optional[int] = None,
+) -> list:
+    """
+    Score many leads concurrently under a concurrency/tokens-per-minute limit.
+
+    Returns one entry per lead, in input order: the scoring dict, or the
+    exception raised for that lead. Unlike ``analyze_lead`` failed calls get
+    no fallback score, so callers can report failures per lead; only while
+    the circuit breaker is open do leads get the rule-based score.
+    Explicit limits only narrow the process-wide limiter, which every
+    call still goes through.
+
+    Leads that need the LLM are sent ``pack_size`` (default OPENAI_PACK_SIZE)
+    to a request, with identical leads scored once; a pack size of 1 sends
+    one verbose prompt per lead.
+    """
+    batch_limiter = limiter
+    if max_concurrency or tokens_per_minute:
+        # Tighter limits for this batch, inside the process-wide ones
+        batch_limiter = RateLimiter(
+            max_concurrency or OPENAI_MAX_CONCURRENCY,
+            tokens_per_minute or OPENAI_TOKENS_PER_MINUTE,
+            parent=limiter,
+        )
+
+    pack_size = pack_size or OPENAI_PACK_SIZE
+    if pack_size <= 1:
+        return await asyncio.gather(
+            *(request_score(lead, batch_limiter) for lead in leads),
+            return_exceptions=True,
+        )
+
+    results: list = [None] * len(leads)
+    pending: Dict[str, List[int]] = {}
+    for i, lead in enumerate(leads):
+        quick = fast_path(lead)
+        if quick is not None:
+            results[i] = quick
+            continue
+        key = cache_key(lead)
+        cached = score_cache.get(key)
+        if cached is not None:
+            results[i] = cached
+            continue
+        pending.setdefault(key, []).append(i)
+
+    groups = list(pending.values())
+    packs = [groups[start:start + pack_size] for start in range(0, len(groups), pack_size)]
+    scored = await asyncio.gather(
+        *(request_pack([leads[group[0]] for group in pack], batch_limiter) for pack in packs)
+    )
+    for pack, pack_results in zip(packs, scored):
+        for group, result in zip(pack, pack_results):
+            for i in group:
+                results[i] = result
+    return results
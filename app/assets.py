@@ -0,0 +1,151 @@
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional; assets are then served gzip-only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+FRONTEND_DIR = os.getenv("FRONTEND_DIR", "frontend")
+STATIC_PREFIX = "/static/"
+
+# Content-hashed URLs never change meaning, so browsers may keep them forever.
+# Pages and unhashed URLs are revalidated with their ETag on every use.
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Not worth a Content-Encoding header below this many bytes
+COMPRESS_MIN_SIZE = 256
+
+class Asset:
+    """One file, read and compressed once, with a strong ETag per encoding"""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.encodings: Dict[str, bytes] = {"identity": body}
+        if len(body) >= COMPRESS_MIN_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.encodings["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.encodings["br"] = compressed
+
+    def etag(self, encoding: str) -> str:
+        # Different bytes per encoding, so each gets its own strong validator
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Accept-Encoding codings and their q-values"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+def negotiate(header: str, available) -> str:
+    """Best encoding of ``available`` the client accepts, preferring brotli"""
+    accepted = _accepted(header)
+    wildcard = accepted.get("*", 0.0)
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, wildcard) > 0:
+            return coding
+    return "identity"
+
+class AssetBundle:
+    """
+    The frontend directory, prepared once per process.
+
+    Every non-HTML file is also published under a content-hashed name
+    (``style.css`` -> ``style.1a2b3c4d5e6f.css``) and the HTML pages are
+    rewritten to reference those, so CSS can be cached as immutable while
+    pages are revalidated cheaply with a strong ETag (304, no body). All
+    files are gzip- and, when the optional ``brotli`` package is installed,
+    brotli-compressed up front; requests pick a precompressed body by
+    Accept-Encoding and no compression happens per request.
+
+    Built by the app lifespan, or on first use if the lifespan did not run.
+    Edits to the directory need a restart (``--reload`` does that).
+    """
+
+    def __init__(self, directory: str = FRONTEND_DIR):
+        self.directory = directory
+        self._files: Optional[Dict[str, Tuple[Asset, str]]] = None
+
+    def build(self):
+        files, urls, pages = {}, {}, []
+        for root, _, names in os.walk(self.directory):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                if name.endswith(".html"):
+                    pages.append((rel, path))
+                    continue
+                with open(path, "rb") as f:
+                    asset = Asset(f.read(), _media_type(name))
+                stem, ext = os.path.splitext(rel)
+                hashed = f"{stem}.{asset.digest}{ext}"
+                files[rel] = (asset, REVALIDATE)
+                files[hashed] = (asset, IMMUTABLE)
+                urls[STATIC_PREFIX + rel] = STATIC_PREFIX + hashed
+
+        for rel, path in pages:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+            for plain, hashed in urls.items():
+                html = html.replace(f'"{plain}"', f'"{hashed}"')
+            files[rel] = (Asset(html.encode(), "text/html; charset=utf-8"), REVALIDATE)
+
+        self._files = files
+        encodings = "gzip, br" if brotli is not None else "gzip"
+        logger.info(f"Prepared {len(files)} frontend assets ({encodings})")
+
+    def _lookup(self, name: str) -> Optional[Tuple[Asset, str]]:
+        if self._files is None:
+            # Racing first requests may both build; the results are identical
+            self.build()
+        return self._files.get(name)
+
+    def response(self, request: Request, name: str) -> Response:
+        found = self._lookup(name)
+        if found is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        asset, cache_control = found
+
+        encoding = negotiate(request.headers.get("accept-encoding", ""), asset.encodings)
+        etag = asset.etag(encoding)
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.encodings[encoding], media_type=asset.media_type, headers=headers)
+
+def _media_type(name: str) -> str:
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+        media_type += "; charset=utf-8"
+    return media_type
+
+frontend = AssetBundle()
@@ -0,0 +1,73 @@
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LazyClient:
+    """
+    Stand-in for an SDK client that is only built on first use.
+
+    Attribute access is forwarded to the real client, so modules keep a plain
+    global (``supabase.table(...)``, ``client.chat...``) while importing the
+    app stays cheap: no SDK import, credential lookup or connection pool
+    until something actually calls out. Every instance registers itself so
+    the app lifespan can warm all clients up front and close their pools on
+    shutdown.
+    """
+
+    _registry: List["LazyClient"] = []
+
+    def __init__(self, name: str, factory: Callable, closer: Optional[Callable] = None):
+        self._name = name
+        self._factory = factory
+        self._closer = closer
+        self._client = None
+        self._lock = threading.Lock()
+        LazyClient._registry.append(self)
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+                    logger.info(f"Initialized {self._name} client")
+        return self._client
+
+    @property
+    def initialized(self) -> bool:
+        return self._client is not None
+
+    def __getattr__(self, attr: str):
+        # Introspection (mock.patch, copy, asyncio.iscoroutinefunction) probes
+        # dunder and private marker attributes; answering must not build the client
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    async def close(self):
+        """Release the client's connections; the next use builds a fresh one"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and self._closer is not None:
+            result = self._closer(client)
+            if inspect.isawaitable(result):
+                await result
+
+    def __repr__(self) -> str:
+        state = "initialized" if self.initialized else "lazy"
+        return f"<LazyClient {self._name} ({state})>"
+
+def warm_clients():
+    """Build every registered client (blocking; run off the event loop)"""
+    for lazy in LazyClient._registry:
+        try:
+            lazy.get()
+        except Exception as e:
+            # Missing credentials etc. surface on the first real call instead
+            logger.warning(f"Could not initialize {lazy._name} client: {e}")
+
+async def close_clients():
+    await asyncio.gather(*(lazy.close() for lazy in LazyClient._registry))
@@ -1,10 +1,109 @@
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import json
+import uuid
+import base64
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from .clients import LazyClient
+from .metrics import DB_CALL_LATENCY, DB_QUEUE_WAIT, count_db_call
 
-load_dotenv()
+# Upper bound on concurrent Supabase round-trips per process. The executor and
+# the HTTP connection pool are sized together so a worker thread never waits
+# on a free connection.
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "20"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "30"))
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+def _create_supabase():
+    # Imported here: the supabase SDK and httpx are a large share of cold start
+    import httpx
+    from supabase import create_client, ClientOptions
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+    http_client = httpx.Client(
+        timeout=DB_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=DB_MAX_WORKERS,
+            max_keepalive_connections=DB_MAX_WORKERS,
+        ),
+        follow_redirects=True,
+    )
+    return create_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_KEY"),
+        options=ClientOptions(httpx_client=http_client),
+    )
+
+def _close_supabase(client):
+    client.options.httpx_client.close()
+
+# Built on first use (or at startup by the app lifespan)
+supabase = LazyClient("supabase", _create_supabase, _close_supabase)
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="supabase")
+
+async def execute(query):
+    """
+    Run a Supabase query builder on the bounded DB thread pool.
+
+    The supabase client is synchronous, so calling ``.execute()`` inside an
+    ``async def`` route stalls every other request on the event loop. Routes
+    build the query as usual and hand it here instead:
+
+        result = await execute(supabase.table("leads").select("*"))
+    """
+    count_db_call()
+    submitted = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        DB_QUEUE_WAIT.observe(started - submitted)
+        try:
+            return query.execute()
+        finally:
+            DB_CALL_LATENCY.observe(time.perf_counter() - started)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, run)
+
+def encode_cursor(row: dict, order_column: str = "created_at") -> str:
+    """Opaque keyset cursor pointing just after ``row`` in (order_column, id) order"""
+    raw = json.dumps([row[order_column], row["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of `encode_cursor`; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Both values are interpolated into a PostgREST filter, so only accept
+        # a real timestamp and UUID
+        datetime.fromisoformat(timestamp)
+        uuid.UUID(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return timestamp, row_id
+
+def keyset_page(query, cursor: Optional[str], limit: int, order_column: str = "created_at"):
+    """
+    Order a query newest-first by (order_column, id) and resume after ``cursor``.
+
+    Fetches one extra row so `split_page` can tell whether another page
+    exists. Unlike OFFSET, the cost of a page does not grow with its depth
+    as long as the table has a matching (order_column, id) index.
+    """
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f'{order_column}.lt."{timestamp}",'
+            f'and({order_column}.eq."{timestamp}",id.lt.{row_id})'
+        )
+    return query.order(order_column, desc=True).order("id", desc=True).limit(limit + 1)
+
+def split_page(rows: list, limit: int, order_column: str = "created_at") -> Tuple[list, Optional[str]]:
+    """Trim the look-ahead row from a `keyset_page` result and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], order_column)
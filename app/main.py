@@ -1,31 +1,77 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+import asyncio
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 import os
 import logging
 
+# Settings are read from the environment when modules load, so .env has to be
+# applied first. This is the only place it is loaded.
+load_dotenv()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
-app = FastAPI()
-
 from .routes import leads, customers, admin as admin_routes
+from .services.scoring_queue import scoring_queue
+from .metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, monitor_event_loop, render
+from .clients import close_clients, warm_clients
+from .assets import frontend
+
+# Build the Supabase/OpenAI/Stripe clients right after startup instead of on
+# the first request that needs each one
+WARM_CLIENTS = os.getenv("WARM_CLIENTS", "true").lower() == "true"
+
+# Dynamic responses (JSON, CSV exports, /metrics) smaller than this go out
+# uncompressed; static assets carry their own precompressed bodies
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1000"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in a thread: the server starts accepting requests immediately
+    warmup = asyncio.create_task(asyncio.to_thread(warm_clients)) if WARM_CLIENTS else None
+    # Hash and compress the frontend once, before the first page view
+    await asyncio.to_thread(frontend.build)
+    # Background scoring workers for /leads/ingest
+    await scoring_queue.start()
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    yield
+    loop_monitor.cancel()
+    await scoring_queue.stop()
+    if warmup:
+        await warmup
+    await close_clients()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(leads.router)
 app.include_router(customers.router)
 app.include_router(admin_routes.router)
 
-# Serve static files
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+# Prometheus scrape endpoint (request latency, handler stages, DB calls, loop lag)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
+
+# Serve static files (precompressed; content-hashed names are cached forever)
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def read_static(path: str, request: Request):
+    return frontend.response(request, path)
 
 # Serve the HTML form at the root
-@app.get("/", response_class=FileResponse)
-async def read_index():
-    return FileResponse("frontend/index.html")
+@app.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+async def read_index(request: Request):
+    return frontend.response(request, "index.html")
 
 # Serve admin dashboard
-@app.get("/admin", response_class=FileResponse)
-async def read_admin():
-    return FileResponse("frontend/admin.html")
+@app.api_route("/admin", methods=["GET", "HEAD"], include_in_schema=False)
+async def read_admin(request: Request):
+    return frontend.response(request, "admin.html")
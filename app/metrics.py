@@ -0,0 +1,131 @@
+import os
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds",
+    "Latency of named stages inside request handlers",
+    ["handler", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_CALLS_PER_REQUEST = Histogram(
+    "db_calls_per_request",
+    "Supabase round-trips made while handling one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 20, 50),
+)
+DB_CALL_LATENCY = Histogram(
+    "db_call_duration_seconds",
+    "Supabase round-trip latency, excluding time queued for a DB thread",
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUEUE_WAIT = Histogram(
+    "db_queue_wait_seconds",
+    "Time a Supabase call waited for a free DB thread (DB_MAX_WORKERS)",
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a periodic timer",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+OPENAI_CIRCUIT_OPEN = Gauge(
+    "openai_circuit_open",
+    "1 while the OpenAI circuit breaker is open or half-open",
+    multiprocess_mode="max",
+)
+
+# Per-request DB call counter. The middleware sets a fresh one-element list;
+# tasks spawned by the handler inherit the same list through the context.
+_db_calls: ContextVar[Optional[list]] = ContextVar("db_calls", default=None)
+
+EVENT_LOOP_LAG_INTERVAL = 0.5
+
+def count_db_call():
+    calls = _db_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+@contextmanager
+def stage(handler: str, name: str):
+    """Time one stage of a handler: ``with stage("score_lead", "openai"): ...``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(handler, name).observe(time.perf_counter() - start)
+
+def _route_template(scope: dict) -> str:
+    # Set by the router once a route matched; keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and DB calls per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        calls = [0]
+        token = _db_calls.set(calls)
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.dec()
+            _db_calls.reset(token)
+            route = _route_template(scope)
+            REQUEST_LATENCY.labels(scope["method"], route, str(status["code"])).observe(elapsed)
+            DB_CALLS_PER_REQUEST.labels(route).observe(calls[0])
+
+async def monitor_event_loop(interval: float = EVENT_LOOP_LAG_INTERVAL):
+    """Sleep in a loop and record how much later than asked each wake-up is"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
+
+def render() -> bytes:
+    """Prometheus text exposition of every registered metric"""
+    from .ai.scorer import breaker
+
+    OPENAI_CIRCUIT_OPEN.set(1 if breaker.state != breaker.CLOSED else 0)
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Under gunicorn each worker writes its samples to this directory;
+        # whichever worker serves the scrape aggregates all of them
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
+from .ai.limiter import OPENAI_MAX_CONCURRENCY
 
 class RawLead(BaseModel):
     full_name: str
@@ -17,6 +18,38 @@ class RawLead(BaseModel):
 class ScoredLead(RawLead):
     score: int
     reasoning: str
+    id: Optional[str] = None
+    # True when the lead matched one stored earlier; no id is returned then
+    duplicate: bool = False
+
+class IngestedLead(BaseModel):
+    # None for a duplicate: the stored lead's id is not disclosed
+    id: Optional[str] = None
+    status: str
+    duplicate: bool = False
+
+class LeadStatus(BaseModel):
+    id: str
+    status: str
+    score: Optional[int] = None
+    reasoning: Optional[str] = None
+
+class LeadBatch(BaseModel):
+    leads: List[RawLead]
+    # Can only narrow the server's OpenAI limits, never widen them
+    max_concurrency: Optional[int] = Field(None, ge=1, le=OPENAI_MAX_CONCURRENCY)
+    tokens_per_minute: Optional[int] = Field(None, ge=1)
+    pack_size: Optional[int] = Field(None, ge=1)
+
+class BatchFailure(BaseModel):
+    index: int
+    email: str
+    error: str
+
+class BatchScoreResponse(BaseModel):
+    results: List[ScoredLead]
+    failures: List[BatchFailure]
+    persisted: bool
 
 class Customer(BaseModel):
     id: Optional[UUID] = None
@@ -24,6 +57,7 @@ class Customer(BaseModel):
     email: str
     phone: Optional[str] = None
     stripe_customer_id: Optional[str] = None
+    service_zip_prefixes: List[str] = []
     created_at: Optional[datetime] = None
 
 class Subscription(BaseModel):
@@ -36,6 +70,8 @@ class Subscription(BaseModel):
     stripe_subscription_id: Optional[str] = None
     current_period_start: Optional[datetime] = None
     current_period_end: Optional[datetime] = None
+    overage_billed: int = 0
+    overage_period: Optional[str] = None
     created_at: Optional[datetime] = None
 
 class LeadPurchase(BaseModel):
@@ -44,4 +80,80 @@ class LeadPurchase(BaseModel):
     customer_id: UUID
     purchase_type: str  # 'included', 'overage'
     price_paid: float
-    purchased_at: Optional[datetime] = None
\ No newline at end of file
+    purchased_at: Optional[datetime] = None
+
+# Admin API responses. Rows come straight from PostgREST, so timestamps and
+# dates stay ISO strings instead of being parsed and re-formatted.
+
+class LeadRow(BaseModel):
+    """One `/admin/leads` row; only the projected ``fields=`` are sent"""
+    id: Optional[str] = None
+    created_at: Optional[str] = None
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    move_date: Optional[str] = None
+    origin_zip: Optional[str] = None
+    destination_zip: Optional[str] = None
+    home_size: Optional[str] = None
+    budget: Optional[str] = None
+    urgency: Optional[str] = None
+    score: Optional[int] = None
+    reasoning: Optional[str] = None
+    status: Optional[str] = None
+    assigned_to: Optional[str] = None
+
+class LeadPage(BaseModel):
+    leads: List[LeadRow]
+    count: int
+    next_cursor: Optional[str] = None
+
+class SubscriptionRow(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[str] = None
+    customer_id: Optional[str] = None
+    tier: str
+    status: str
+    leads_included: int
+    leads_used: int = 0
+
+class CustomerRow(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    company_name: str
+    email: Optional[str] = None
+    subscriptions: List[SubscriptionRow] = []
+
+class CustomerList(BaseModel):
+    customers: List[CustomerRow]
+    count: int
+
+class AssignResult(BaseModel):
+    success: bool
+    purchase_type: str
+    price: float
+    message: str
+
+class RouteAssignment(BaseModel):
+    lead_id: str
+    customer_id: str
+    purchase_type: Optional[str] = None
+    price: Optional[float] = None
+
+class RouteFailure(BaseModel):
+    lead_id: str
+    customer_id: str
+    error: str
+
+class RouteResult(BaseModel):
+    routed: int
+    assignments: List[RouteAssignment]
+    unrouted: List[str]
+    failed: List[RouteFailure]
+
+class RouteRequest(BaseModel):
+    lead_ids: Optional[List[str]] = None  # default: best available leads
+    limit: int = 1000
+    dry_run: bool = False
@@ -0,0 +1,15 @@
+from typing import Any
+import orjson
+from starlette.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    For handlers that build their payload by hand (no ``response_model``).
+    Routes with a response model are already serialized to bytes by
+    Pydantic and should keep FastAPI's default response class.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
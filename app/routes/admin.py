@@ -1,7 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from ..db import supabase
+from ..db import supabase, execute, keyset_page, split_page
+from ..metrics import stage
+from ..ai.cache import score_cache
+from ..ai.prescorer import fast_path_stats
+from ..ai.scorer import ai_stats
+from ..services.scoring_queue import scoring_queue
+from ..services.analytics import analytics_snapshot
+from ..services.usage import usage_cache
+from ..services.dedup import lead_index
+from ..services.export import iter_rows, stream_export, EXPORT_FORMATS
+from ..services.routing import LeadRouter
+from ..services.billing import run_overage_billing
+from ..models import RouteRequest, LeadPage, CustomerList, AssignResult, RouteResult
+from ..responses import ORJSONResponse
 from typing import Optional
+import asyncio
 import secrets
 import os
 
@@ -12,6 +27,41 @@ security = HTTPBasic()
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "changeme")
 
+# /admin/leads paging and projection
+LEADS_PAGE_SIZE = int(os.getenv("LEADS_PAGE_SIZE", "50"))
+LEADS_PAGE_MAX = int(os.getenv("LEADS_PAGE_MAX", "200"))
+LEAD_FIELDS = (
+    "id", "created_at", "full_name", "email", "phone", "move_date",
+    "origin_zip", "destination_zip", "home_size", "budget", "urgency",
+    "score", "reasoning", "status", "assigned_to",
+)
+# The long `reasoning` text is only sent when asked for
+DEFAULT_LEAD_FIELDS = tuple(f for f in LEAD_FIELDS if f != "reasoning")
+
+def _lead_columns(fields: Optional[str]) -> list:
+    """Validate a `fields=` projection; id and created_at are always kept for the cursor"""
+    if not fields:
+        return list(DEFAULT_LEAD_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LEAD_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id", "created_at"] + [f for f in requested if f not in ("id", "created_at")]
+
+ROUTING_MAX_LEADS = int(os.getenv("ROUTING_MAX_LEADS", "5000"))
+
+PURCHASE_FIELDS = ("id", "lead_id", "customer_id", "purchase_type", "price_paid", "purchased_at")
+
+def _export_response(pages, columns: list, name: str, format: str, gzip: bool) -> StreamingResponse:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    filename = f"{name}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(pages, columns, format, gzip=gzip),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 def verify_admin(credentials: HTTPBasicCredentials = Depends(security)):
     """Verify admin credentials"""
     correct_username = secrets.compare_digest(credentials.username, ADMIN_USERNAME)
@@ -25,136 +75,235 @@ def verify_admin(credentials: HTTPBasicCredentials = Depends(security)):
         )
     return credentials.username
 
-@router.get("/admin/leads")
+@router.get("/admin/leads", response_model=LeadPage, response_model_exclude_unset=True)
 async def list_leads(
     status: Optional[str] = None,
     min_score: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(LEADS_PAGE_SIZE, ge=1),
+    fields: Optional[str] = None,
     admin: str = Depends(verify_admin)
 ):
-    """List all leads with optional filters"""
+    """List leads newest-first, one keyset page at a time, with optional filters"""
+    limit = min(limit, LEADS_PAGE_MAX)
+    columns = _lead_columns(fields)
+
     try:
-        query = supabase.table("leads").select("*")
-        
+        query = supabase.table("leads").select(",".join(columns))
+
         if status:
             query = query.eq("status", status)
-        if min_score:
+        if min_score is not None:
             query = query.gte("score", min_score)
-        
-        result = query.order("created_at", desc=True).execute()
-        return {"leads": result.data, "count": len(result.data)}
+
+        query = keyset_page(query, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = await execute(query)
+        leads, next_cursor = split_page(result.data, limit)
+        # Validated by LeadPage; columns not in fields= stay unset and are omitted
+        return {"leads": leads, "count": len(leads), "next_cursor": next_cursor}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/admin/leads/{lead_id}/assign")
+@router.get("/admin/export/leads")
+async def export_leads(
+    format: str = "csv",
+    gzip: bool = False,
+    status: Optional[str] = None,
+    min_score: Optional[int] = None,
+    assigned_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    admin: str = Depends(verify_admin)
+):
+    """Stream leads as CSV or NDJSON, page by page"""
+    columns = _lead_columns(fields)
+
+    def apply_filters(query):
+        if status:
+            query = query.eq("status", status)
+        if min_score is not None:
+            query = query.gte("score", min_score)
+        if assigned_to:
+            query = query.eq("assigned_to", assigned_to)
+        return query
+
+    pages = iter_rows("leads", columns, apply_filters)
+    return _export_response(pages, columns, "leads", format, gzip)
+
+@router.get("/admin/export/purchases")
+async def export_purchases(
+    format: str = "csv",
+    gzip: bool = False,
+    customer_id: Optional[str] = None,
+    purchase_type: Optional[str] = None,
+    admin: str = Depends(verify_admin)
+):
+    """Stream lead purchases as CSV or NDJSON for billing reconciliation"""
+    columns = list(PURCHASE_FIELDS)
+
+    def apply_filters(query):
+        if customer_id:
+            query = query.eq("customer_id", customer_id)
+        if purchase_type:
+            query = query.eq("purchase_type", purchase_type)
+        return query
+
+    pages = iter_rows("lead_purchases", columns, apply_filters, order_column="purchased_at")
+    return _export_response(pages, columns, "purchases", format, gzip)
+
+@router.post("/admin/leads/{lead_id}/assign", response_model=AssignResult)
 async def assign_lead(
     lead_id: str,
     customer_id: str,
     admin: str = Depends(verify_admin)
 ):
     """Assign a lead to a customer"""
+    from ..services.stripe_service import PRICING_TIERS
+    overage_prices = {tier: plan["overage_price"] for tier, plan in PRICING_TIERS.items()}
+
+    # Lock subscription, claim lead, record purchase and bump usage in one
+    # transaction (see supabase/migrations/*_assign_lead.sql)
     try:
-        # Get customer's active subscription
-        subscription = supabase.table("subscriptions")\
-            .select("*")\
-            .eq("customer_id", customer_id)\
-            .eq("status", "active")\
-            .execute()
-        
-        if not subscription.data:
+        with stage("assign_lead", "rpc"):
+            response = await execute(supabase.rpc("assign_lead", {
+                "p_lead_id": lead_id,
+                "p_customer_id": customer_id,
+                "p_overage_prices": overage_prices,
+            }))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    result = response.data
+    if not result["success"]:
+        if result["error"] == "no_active_subscription":
             raise HTTPException(status_code=404, detail="No active subscription found")
-        
-        sub = subscription.data[0]
-        
-        # Determine if this is an included lead or overage
-        is_overage = sub["leads_used"] >= sub["leads_included"]
-        purchase_type = "overage" if is_overage else "included"
-        
-        # Calculate price
-        from ..services.stripe_service import PRICING_TIERS
-        price = PRICING_TIERS[sub["tier"]]["overage_price"] if is_overage else 0
-        
-        # Update lead status
-        supabase.table("leads").update({
-            "status": "sold",
-            "assigned_to": customer_id
-        }).eq("id", lead_id).execute()
-        
-        # Record purchase
-        purchase_data = {
-            "lead_id": lead_id,
-            "customer_id": customer_id,
-            "purchase_type": purchase_type,
-            "price_paid": price
-        }
-        supabase.table("lead_purchases").insert(purchase_data).execute()
-        
-        # Update subscription usage
-        supabase.table("subscriptions").update({
-            "leads_used": sub["leads_used"] + 1
-        }).eq("id", sub["id"]).execute()
-        
-        return {
-            "success": True,
-            "purchase_type": purchase_type,
-            "price": price,
-            "message": f"Lead assigned to customer"
-        }
-        
+        raise HTTPException(status_code=409, detail="Lead is not available")
+
+    analytics_snapshot.lead_sold(result["price"])
+    usage_cache.lead_assigned(customer_id, result)
+
+    return {
+        "success": True,
+        "purchase_type": result["purchase_type"],
+        "price": result["price"],
+        "message": f"Lead assigned to customer"
+    }
+
+@router.post("/admin/leads/route", response_model=RouteResult)
+async def route_leads(request: RouteRequest, admin: str = Depends(verify_admin)):
+    """Automatically assign available leads to customers by area, tier and quota"""
+    from ..services.stripe_service import PRICING_TIERS
+    overage_prices = {tier: plan["overage_price"] for tier, plan in PRICING_TIERS.items()}
+    limit = min(request.limit, ROUTING_MAX_LEADS)
+
+    try:
+        leads_query = supabase.table("leads")\
+            .select("id, origin_zip, destination_zip, score")\
+            .eq("status", "available")
+        if request.lead_ids:
+            leads_query = leads_query.in_("id", request.lead_ids[:limit])
+        leads_query = leads_query.order("score", desc=True).limit(limit)
+
+        leads, subscriptions, customers = await asyncio.gather(
+            execute(leads_query),
+            execute(
+                supabase.table("subscriptions")
+                .select("customer_id, tier, leads_included, leads_used")
+                .eq("status", "active")
+            ),
+            execute(supabase.table("customers").select("id, service_zip_prefixes")),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    areas = {c["id"]: c.get("service_zip_prefixes") for c in customers.data}
+    for sub in subscriptions.data:
+        sub["service_zip_prefixes"] = areas.get(sub["customer_id"])
+
+    assignments, unrouted = LeadRouter(subscriptions.data).route(leads.data)
+
+    if request.dry_run or not assignments:
+        return {"routed": 0, "assignments": assignments, "unrouted": unrouted, "failed": []}
+
+    # Commit every assignment in one transaction
+    try:
+        response = await execute(supabase.rpc("assign_leads_bulk", {
+            "p_assignments": assignments,
+            "p_overage_prices": overage_prices,
+        }))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/admin/customers")
+    routed, failed = [], []
+    for assignment, result in zip(assignments, response.data):
+        if result["success"]:
+            routed.append({**assignment, "purchase_type": result["purchase_type"], "price": result["price"]})
+            analytics_snapshot.lead_sold(result["price"])
+            usage_cache.lead_assigned(assignment["customer_id"], result)
+        else:
+            failed.append({**assignment, "error": result["error"]})
+
+    return {"routed": len(routed), "assignments": routed, "unrouted": unrouted, "failed": failed}
+
+@router.post("/admin/billing/overage", response_class=ORJSONResponse)
+async def bill_overages(admin: str = Depends(verify_admin)):
+    """Charge all over-quota customers for their overage leads"""
+    try:
+        return await run_overage_billing()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/admin/customers", response_model=CustomerList, response_model_exclude_unset=True)
 async def list_customers(admin: str = Depends(verify_admin)):
     """List all customers with their subscriptions"""
     try:
-        customers = supabase.table("customers")\
-            .select("*, subscriptions(*)")\
-            .execute()
+        customers = await execute(
+            supabase.table("customers").select("*, subscriptions(*)")
+        )
         
         return {"customers": customers.data, "count": len(customers.data)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/admin/analytics")
-async def get_analytics(admin: str = Depends(verify_admin)):
+async def get_analytics(request: Request, admin: str = Depends(verify_admin)):
     """Get revenue and usage analytics"""
     try:
-        # Total customers
-        customers = supabase.table("customers").select("id").execute()
-        total_customers = len(customers.data)
-        
-        # Active subscriptions
-        active_subs = supabase.table("subscriptions")\
-            .select("*")\
-            .eq("status", "active")\
-            .execute()
-        
-        # Calculate MRR (Monthly Recurring Revenue)
-        from ..services.stripe_service import PRICING_TIERS
-        mrr = sum(PRICING_TIERS[sub["tier"]]["price"] for sub in active_subs.data)
-        
-        # Total leads
-        leads = supabase.table("leads").select("id, status").execute()
-        total_leads = len(leads.data)
-        available_leads = len([l for l in leads.data if l.get("status") == "available"])
-        sold_leads = len([l for l in leads.data if l.get("status") == "sold"])
-        
-        # Overage revenue
-        purchases = supabase.table("lead_purchases")\
-            .select("price_paid")\
-            .eq("purchase_type", "overage")\
-            .execute()
-        overage_revenue = sum(p["price_paid"] for p in purchases.data)
-        
-        return {
-            "total_customers": total_customers,
-            "active_subscriptions": len(active_subs.data),
-            "monthly_recurring_revenue": mrr,
-            "total_leads": total_leads,
-            "available_leads": available_leads,
-            "sold_leads": sold_leads,
-            "overage_revenue": overage_revenue,
-            "total_revenue": mrr + overage_revenue
-        }
+        with stage("get_analytics", "snapshot"):
+            _, etag = await analytics_snapshot.get()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    # Let the dashboard revalidate cheaply on every poll
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(analytics_snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/admin/cache/stats", response_class=ORJSONResponse)
+async def get_cache_stats(admin: str = Depends(verify_admin)):
+    """Get scoring cache hit/miss counters"""
+    return score_cache.stats()
+
+@router.get("/admin/fastpath/stats", response_class=ORJSONResponse)
+async def get_fastpath_stats(admin: str = Depends(verify_admin)):
+    """Get rule-based fast path vs LLM escalation counts"""
+    return fast_path_stats()
+
+@router.get("/admin/ai/stats", response_class=ORJSONResponse)
+async def get_ai_stats(admin: str = Depends(verify_admin)):
+    """Get OpenAI call latency percentiles, failures and circuit breaker state"""
+    return ai_stats()
+
+@router.get("/admin/dedup/stats", response_class=ORJSONResponse)
+async def get_dedup_stats(admin: str = Depends(verify_admin)):
+    """Get in-memory duplicate lead index size and hit counters"""
+    return lead_index.stats()
+
+@router.get("/admin/queue/stats", response_class=ORJSONResponse)
+async def get_queue_stats(admin: str = Depends(verify_admin)):
+    """Get background scoring queue depth, lag and throughput counters"""
+    return scoring_queue.stats()
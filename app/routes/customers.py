@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from ..models import Customer, Subscription
-from ..db import supabase
+from ..db import supabase, execute
 from ..services.stripe_service import create_customer, create_subscription, PRICING_TIERS
+from ..services.analytics import analytics_snapshot
+from ..services.usage import usage_cache
 from pydantic import BaseModel
+from typing import List
 
 router = APIRouter()
 
@@ -11,6 +14,7 @@ class CustomerRegistration(BaseModel):
     email: str
     phone: str = None
     tier: str  # 'starter', 'professional', 'enterprise'
+    service_zip_prefixes: List[str] = []  # 3-digit zip prefixes; empty = nationwide
 
 @router.post("/customers/register")
 async def register_customer(registration: CustomerRegistration):
@@ -31,10 +35,11 @@ async def register_customer(registration: CustomerRegistration):
             "company_name": registration.company_name,
             "email": registration.email,
             "phone": registration.phone,
-            "stripe_customer_id": stripe_result["stripe_customer_id"]
+            "stripe_customer_id": stripe_result["stripe_customer_id"],
+            "service_zip_prefixes": registration.service_zip_prefixes
         }
         
-        customer_response = supabase.table("customers").insert(customer_data).execute()
+        customer_response = await execute(supabase.table("customers").insert(customer_data))
         customer_id = customer_response.data[0]["id"]
         
         # Create Stripe subscription
@@ -56,7 +61,9 @@ async def register_customer(registration: CustomerRegistration):
             "stripe_subscription_id": sub_result["subscription_id"]
         }
         
-        supabase.table("subscriptions").insert(subscription_data).execute()
+        await execute(supabase.table("subscriptions").insert(subscription_data))
+        analytics_snapshot.customer_registered(registration.tier, sub_result["status"])
+        usage_cache.invalidate(customer_id)
         
         return {
             "success": True,
@@ -72,7 +79,7 @@ async def register_customer(registration: CustomerRegistration):
 async def get_customer(customer_id: str):
     """Get customer details"""
     try:
-        customer = supabase.table("customers").select("*").eq("id", customer_id).execute()
+        customer = await execute(supabase.table("customers").select("*").eq("id", customer_id))
         if not customer.data:
             raise HTTPException(status_code=404, detail="Customer not found")
         return customer.data[0]
@@ -83,24 +90,19 @@ async def get_customer(customer_id: str):
 async def get_customer_usage(customer_id: str):
     """Get customer's lead usage statistics"""
     try:
-        subscription = supabase.table("subscriptions")\
-            .select("*")\
-            .eq("customer_id", customer_id)\
-            .eq("status", "active")\
-            .execute()
-        
-        if not subscription.data:
-            raise HTTPException(status_code=404, detail="No active subscription found")
-        
-        sub = subscription.data[0]
-        remaining = sub["leads_included"] - sub["leads_used"]
-        
-        return {
-            "tier": sub["tier"],
-            "leads_included": sub["leads_included"],
-            "leads_used": sub["leads_used"],
-            "leads_remaining": remaining,
-            "overage_price": PRICING_TIERS[sub["tier"]]["overage_price"]
-        }
+        sub = await usage_cache.get(customer_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    if sub is None:
+        raise HTTPException(status_code=404, detail="No active subscription found")
+
+    remaining = sub["leads_included"] - sub["leads_used"]
+
+    return {
+        "tier": sub["tier"],
+        "leads_included": sub["leads_included"],
+        "leads_used": sub["leads_used"],
+        "leads_remaining": remaining,
+        "overage_price": PRICING_TIERS[sub["tier"]]["overage_price"]
+    }
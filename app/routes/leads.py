@@ -1,34 +1,203 @@
 from fastapi import APIRouter, HTTPException
+import os
+import uuid
 import logging
-from ..models import RawLead, ScoredLead
+from typing import Dict, List, Optional
+from ..models import (
+    RawLead, ScoredLead, IngestedLead, LeadStatus,
+    LeadBatch, BatchFailure, BatchScoreResponse,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-from ..db import supabase
-from ..ai.scorer import analyze_lead
+from ..db import supabase, execute
+from ..metrics import stage
+from ..ai.scorer import analyze_lead, analyze_leads
+from ..services.scoring_queue import scoring_queue
+from ..services.analytics import analytics_snapshot
+from ..services.dedup import dedup_keys, find_duplicates, insert_leads, fetch_leads
+
+BATCH_MAX_LEADS = int(os.getenv("BATCH_MAX_LEADS", "1000"))
+
+ROW_EXCLUDE = {"id", "duplicate"}
+
+def _scored(lead: RawLead, ai_result: dict) -> ScoredLead:
+    """Attach the AI result to a validated lead (its field values pass through as-is)"""
+    return ScoredLead.model_validate({
+        **lead.__dict__,
+        "score": ai_result.get("score", 0),
+        "reasoning": ai_result.get("reasoning", "No reasoning provided."),
+    })
+
+def _row(scored: ScoredLead) -> dict:
+    """The `leads` row for a scored lead, JSON-ready"""
+    return scored.model_dump(mode="json", exclude=ROW_EXCLUDE)
+
+DUPLICATE_REASONING = "Matches a lead submitted earlier."
+
+def _duplicate(lead: RawLead, stored: dict, scored: Optional[ScoredLead] = None) -> ScoredLead:
+    """
+    Response for a submission that matched the ``stored`` lead.
+
+    Only the stored lead's score is disclosed; every other field is the
+    caller's own submission. The endpoints are public and a match needs
+    only one of email, phone or name, so neither the stored row nor its id
+    (which unlocks GET /leads/{id}/status) nor its reasoning (which may
+    quote the stored details) is handed out.
+    """
+    score = stored.get("score")
+    if score is None:
+        # The earlier lead is still pending background scoring
+        score = scored.score if scored is not None else 0
+    return ScoredLead.model_validate({
+        **lead.__dict__,
+        "score": score,
+        "reasoning": DUPLICATE_REASONING,
+        "duplicate": True,
+    })
+
+async def _known_duplicates(keys: List[List[str]]) -> Dict[int, dict]:
+    """Id and score of already stored leads, by input position"""
+    known = await find_duplicates(keys)
+    if not known:
+        return {}
+    rows = await fetch_leads(list(known.values()))
+    return {
+        i: rows[lead_id] for i, lead_id in known.items()
+        if lead_id in rows and rows[lead_id].get("score") is not None
+    }
 
 @router.post("/leads/score", response_model=ScoredLead)
 async def score_lead(lead: RawLead):
+    keys = dedup_keys(lead)
+    with stage("score_lead", "dedup"):
+        known = await _known_duplicates([keys])
+    if known:
+        return _duplicate(lead, known[0])
+
     # Use AI to score the lead
-    ai_result = await analyze_lead(lead)
-    
-    score = ai_result.get("score", 0)
-    reasoning = ai_result.get("reasoning", "No reasoning provided.")
-    
-    scored_lead_data = lead.dict()
-    # Convert date objects to ISO strings for JSON serialization
-    if scored_lead_data.get("move_date"):
-        scored_lead_data["move_date"] = scored_lead_data["move_date"].isoformat()
-        
-    scored_lead_data.update({"score": score, "reasoning": reasoning})
-    
-    # Persist to Supabase
+    with stage("score_lead", "openai"):
+        ai_result = await analyze_lead(lead)
+
+    with stage("score_lead", "build"):
+        scored_lead = _scored(lead, ai_result)
+        scored_lead_data = _row(scored_lead)
+
+    # Persist to Supabase unless the same person was stored meanwhile
     try:
-        supabase.table("leads").insert(scored_lead_data).execute()
+        with stage("score_lead", "insert"):
+            outcome = (await insert_leads([scored_lead_data], [keys]))[0]
+        if outcome["duplicate"]:
+            return _duplicate(lead, outcome["lead"], scored_lead)
+        scored_lead.id = outcome["lead"]["id"]
+        analytics_snapshot.lead_added()
     except Exception as e:
         # In production, we might log this error but still return the score,
         # or raise a 500 depending on requirements.
         logger.error(f"Error saving to DB: {e}", exc_info=True)
 
-    return ScoredLead(**scored_lead_data)
\ No newline at end of file
+    return scored_lead
+
+@router.post("/leads/score/batch", response_model=BatchScoreResponse)
+async def score_leads_batch(batch: LeadBatch):
+    """Score a batch of leads concurrently and persist them in one bulk insert"""
+    if len(batch.leads) > BATCH_MAX_LEADS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_LEADS} leads")
+
+    keys = [dedup_keys(lead) for lead in batch.leads]
+    known = await _known_duplicates(keys)
+    results = {i: _duplicate(batch.leads[i], row) for i, row in known.items()}
+    to_score = [i for i in range(len(batch.leads)) if i not in known]
+
+    ai_results = await analyze_leads(
+        [batch.leads[i] for i in to_score],
+        max_concurrency=batch.max_concurrency,
+        tokens_per_minute=batch.tokens_per_minute,
+        pack_size=batch.pack_size,
+    )
+
+    scored = []
+    positions = []
+    failures = []
+    for index, ai_result in zip(to_score, ai_results):
+        lead = batch.leads[index]
+        if isinstance(ai_result, Exception):
+            failures.append(BatchFailure(index=index, email=lead.email, error=str(ai_result)))
+        else:
+            scored.append(_scored(lead, ai_result))
+            positions.append(index)
+
+    # Persist all successfully scored leads in a single round-trip; repeats
+    # within the batch or of stored leads come back as duplicates
+    persisted = not scored
+    if scored:
+        try:
+            outcomes = await insert_leads([_row(lead) for lead in scored], [keys[i] for i in positions])
+            persisted = True
+            added = 0
+            for index, lead, outcome in zip(positions, scored, outcomes):
+                if outcome["duplicate"]:
+                    results[index] = _duplicate(batch.leads[index], outcome["lead"], lead)
+                else:
+                    lead.id = outcome["lead"]["id"]
+                    results[index] = lead
+                    added += 1
+            if added:
+                analytics_snapshot.lead_added(count=added)
+        except Exception as e:
+            logger.error(f"Error bulk saving {len(scored)} leads to DB: {e}", exc_info=True)
+            results.update(zip(positions, scored))
+
+    return BatchScoreResponse(
+        results=[results[i] for i in sorted(results)],
+        failures=failures,
+        persisted=persisted,
+    )
+
+@router.post("/leads/ingest", response_model=IngestedLead, status_code=202)
+async def ingest_lead(lead: RawLead):
+    """Persist a lead as pending and score it in the background"""
+    keys = dedup_keys(lead)
+    known_id = (await find_duplicates([keys])).get(0)
+    if known_id:
+        known = await fetch_leads([known_id])
+        if known_id in known:
+            return IngestedLead(status=known[known_id]["status"], duplicate=True)
+
+    lead_id = str(uuid.uuid4())
+
+    # Journal first so a crash after the insert can't lose the scoring job
+    job = scoring_queue.journal(lead_id, lead)
+    try:
+        row = lead.model_dump(mode="json")
+        row.update({"id": lead_id, "status": "pending"})
+        outcome = (await insert_leads([row], [keys]))[0]
+    except Exception as e:
+        scoring_queue.discard(lead_id)
+        logger.error(f"Error saving pending lead to DB: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Could not save lead")
+
+    if outcome["duplicate"]:
+        scoring_queue.discard(lead_id)
+        return IngestedLead(status=outcome["lead"]["status"], duplicate=True)
+
+    analytics_snapshot.lead_added(status="pending")
+    scoring_queue.enqueue(job)
+    return IngestedLead(id=lead_id, status="pending")
+
+@router.get("/leads/{lead_id}/status", response_model=LeadStatus)
+async def get_lead_status(lead_id: str):
+    """Get the scoring status of an ingested lead"""
+    try:
+        result = await execute(
+            supabase.table("leads")
+            .select("id, status, score, reasoning")
+            .eq("id", lead_id)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return LeadStatus(**result.data[0])
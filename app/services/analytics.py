@@ -0,0 +1,137 @@
+import os
+import time
+import hashlib
+from typing import Optional, Tuple
+import orjson
+from ..db import supabase, execute
+from .stripe_service import PRICING_TIERS
+from ..shared import generations
+
+# How long the in-memory snapshot is served before re-syncing with the DB
+ANALYTICS_TTL = float(os.getenv("ANALYTICS_TTL", "30"))
+
+async def fetch_analytics() -> dict:
+    """
+    Compute dashboard analytics with a single database-side aggregation.
+
+    The `admin_analytics` function returns counts and sums only, so the cost
+    of this call does not grow with the number of leads or purchases.
+    """
+    result = await execute(supabase.rpc("admin_analytics", {}))
+    stats = result.data
+
+    by_tier = stats["active_subscriptions_by_tier"] or {}
+    # Calculate MRR (Monthly Recurring Revenue)
+    mrr = sum(PRICING_TIERS[tier]["price"] * count for tier, count in by_tier.items())
+    overage_revenue = stats["overage_revenue"]
+
+    return {
+        "total_customers": stats["total_customers"],
+        "active_subscriptions": sum(by_tier.values()),
+        "monthly_recurring_revenue": mrr,
+        "total_leads": stats["total_leads"],
+        "available_leads": stats["available_leads"],
+        "sold_leads": stats["sold_leads"],
+        "overage_revenue": overage_revenue,
+        "total_revenue": mrr + overage_revenue
+    }
+
+class AnalyticsSnapshot:
+    """
+    In-memory analytics kept current by the write paths.
+
+    The snapshot is loaded with `fetch_analytics` and then adjusted in place
+    as leads are scored/sold and customers register, so dashboard polls are
+    served from memory. Every ``ttl`` seconds it is re-synced from the DB to
+    pick up writes made elsewhere (manual edits, other instances).
+
+    Under a multi-worker server each process keeps its own snapshot; every
+    write also bumps a shared generation counter, so the other workers
+    reload on their next read instead of serving stale numbers for a TTL.
+    """
+
+    def __init__(self, ttl: float = ANALYTICS_TTL):
+        self.ttl = ttl
+        self._data: Optional[dict] = None
+        self._etag: Optional[str] = None
+        self._body = b""
+        self._loaded_at = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.refreshes = 0
+
+    async def get(self) -> Tuple[dict, str]:
+        """Return the current analytics and their ETag"""
+        generation = generations.get("analytics")
+        if (
+            self._data is None
+            or generation != self._generation
+            or time.monotonic() - self._loaded_at > self.ttl
+        ):
+            data = await fetch_analytics()
+            self._generation = generation
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            self._set(data)
+        else:
+            self.hits += 1
+        return dict(self._data), self._etag
+
+    @property
+    def body(self) -> bytes:
+        """JSON encoding of the data last returned by `get`"""
+        return self._body
+
+    def invalidate(self):
+        self._data = None
+
+    def _set(self, data: dict):
+        self._data = data
+        # Serialized once per change and served as-is to every poll
+        self._body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        self._etag = f'"{hashlib.sha1(self._body).hexdigest()[:16]}"'
+
+    def _apply(self, **deltas):
+        generation = generations.bump("analytics")
+        if generation != self._generation + 1:
+            # Another worker wrote since our last load; deltas on top of
+            # that would be wrong, so reload on the next read instead
+            self._data = None
+        self._generation = generation
+        if self._data is None:
+            # Nothing cached yet; the next read loads fresh numbers
+            return
+        data = dict(self._data)
+        for field, delta in deltas.items():
+            data[field] += delta
+        self._set(data)
+
+    def lead_added(self, status: str = "available", count: int = 1):
+        self._apply(
+            total_leads=count,
+            available_leads=count if status == "available" else 0,
+        )
+
+    def lead_scored(self):
+        """A pending lead finished background scoring and became available"""
+        self._apply(available_leads=1)
+
+    def lead_sold(self, price: float):
+        self._apply(
+            available_leads=-1,
+            sold_leads=1,
+            overage_revenue=price,
+            total_revenue=price,
+        )
+
+    def customer_registered(self, tier: str, subscription_status: str):
+        active = subscription_status == "active"
+        price = PRICING_TIERS[tier]["price"] if active else 0
+        self._apply(
+            total_customers=1,
+            active_subscriptions=1 if active else 0,
+            monthly_recurring_revenue=price,
+            total_revenue=price,
+        )
+
+analytics_snapshot = AnalyticsSnapshot()
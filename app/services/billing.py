@@ -0,0 +1,79 @@
+import asyncio
+from ..db import supabase, execute
+from .stripe_service import charge_overages
+
+def _period(sub: dict) -> str:
+    # Subscriptions without a period start have one open-ended period
+    return sub.get("current_period_start") or "current"
+
+async def run_overage_billing() -> dict:
+    """
+    Charge every active subscription for overage leads not yet billed.
+
+    Each subscription records the overage it has been charged for in the
+    current period (``overage_billed``); only leads beyond that are charged,
+    and the record is raised after Stripe confirms the charge, so running
+    the job again never charges the same leads twice. All charges are sent
+    to Stripe concurrently. The idempotency key names the first unbilled
+    lead, so two overlapping runs send the same key and Stripe accepts only
+    one of them.
+    """
+    subscriptions, customers = await asyncio.gather(
+        execute(
+            supabase.table("subscriptions")
+            .select("id, customer_id, tier, leads_included, leads_used, current_period_start, "
+                    "overage_billed, overage_period")
+            .eq("status", "active")
+        ),
+        execute(supabase.table("customers").select("id, stripe_customer_id")),
+    )
+    stripe_ids = {c["id"]: c.get("stripe_customer_id") for c in customers.data}
+
+    charges = []
+    skipped = []
+    for sub in subscriptions.data:
+        period = _period(sub)
+        recorded = sub.get("overage_billed") or 0
+        billed = recorded if sub.get("overage_period") == period else 0
+        overage = sub["leads_used"] - sub["leads_included"]
+        if overage <= billed:
+            continue
+        stripe_customer_id = stripe_ids.get(sub["customer_id"])
+        if not stripe_customer_id:
+            skipped.append({"customer_id": sub["customer_id"], "error": "No Stripe customer"})
+            continue
+        charges.append({
+            "customer_id": stripe_customer_id,
+            "num_leads": overage - billed,
+            "tier": sub["tier"],
+            "idempotency_key": f"overage-{sub['id']}-{period}-{billed}",
+            "subscription_id": sub["id"],
+            "period": period,
+            "overage": overage,
+            "recorded": recorded,
+        })
+
+    results = await charge_overages(charges)
+
+    # Only if nobody recorded a charge in between (compare-and-set)
+    await asyncio.gather(*(
+        execute(
+            supabase.table("subscriptions")
+            .update({"overage_billed": c["overage"], "overage_period": c["period"]})
+            .eq("id", c["subscription_id"])
+            .eq("overage_billed", c["recorded"])
+        )
+        for c, r in zip(charges, results) if r["success"]
+    ))
+
+    charged = [
+        {"subscription_id": c["subscription_id"], "num_leads": c["num_leads"], **r}
+        for c, r in zip(charges, results)
+    ]
+    return {
+        "charged": sum(1 for r in results if r["success"]),
+        "failed": sum(1 for r in results if not r["success"]),
+        "total_amount": sum(r["amount"] for r in results if r["success"]),
+        "results": charged,
+        "skipped": skipped,
+    }
@@ -0,0 +1,149 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from ..db import supabase, execute
+from ..models import RawLead
+
+logger = logging.getLogger(__name__)
+
+# Identity keys remembered in-process; older ones are still caught by the DB
+DEDUP_INDEX_SIZE = int(os.getenv("DEDUP_INDEX_SIZE", "200000"))
+
+_NON_DIGITS = re.compile(r"\D")
+
+def _digest(kind: str, value: str) -> str:
+    return f"{kind}:{hashlib.sha256(value.encode()).hexdigest()}"
+
+def normalize_phone(phone: str) -> Optional[str]:
+    """Digits only, without a leading US country code; None if too short to identify anyone"""
+    digits = _NON_DIGITS.sub("", phone or "")
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else None
+
+def dedup_keys(lead: RawLead) -> List[str]:
+    """
+    Identity keys of a lead; two leads sharing any key are the same person.
+
+    Mirrors the backfill in supabase/migrations/*_lead_dedup.sql, so keep
+    both in step when changing the normalization.
+    """
+    keys = []
+    email = (lead.email or "").strip().lower()
+    if email:
+        keys.append(_digest("email", email))
+    phone = normalize_phone(lead.phone)
+    if phone:
+        keys.append(_digest("phone", phone))
+    name = " ".join(lead.full_name.lower().split())
+    keys.append(_digest("person", "|".join([
+        name, lead.move_date.isoformat(), lead.origin_zip.strip(), lead.destination_zip.strip(),
+    ])))
+    return keys
+
+class LeadIndex:
+    """
+    In-process map of identity key -> lead id for recently seen leads.
+
+    A hit means the lead is a known duplicate and can be answered without
+    scoring it. A miss proves nothing (another worker, an older lead), so
+    `find_duplicates` then asks the DB. Bounded LRU of ``max_size`` keys.
+    """
+
+    def __init__(self, max_size: int = DEDUP_INDEX_SIZE):
+        self.max_size = max_size
+        self._keys: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, keys: Iterable[str]) -> Optional[str]:
+        with self._lock:
+            for key in keys:
+                lead_id = self._keys.get(key)
+                if lead_id is not None:
+                    self._keys.move_to_end(key)
+                    self.hits += 1
+                    return lead_id
+            self.misses += 1
+            return None
+
+    def add(self, keys: Iterable[str], lead_id: str):
+        with self._lock:
+            for key in keys:
+                self._keys[key] = lead_id
+                self._keys.move_to_end(key)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._keys), "hits": self.hits, "misses": self.misses}
+
+lead_index = LeadIndex()
+
+async def find_duplicates(keys: List[List[str]]) -> Dict[int, str]:
+    """
+    Lead id of the stored duplicate of each input that has one, by position.
+
+    The in-memory index answers what it can; the rest are looked up in the
+    ``lead_dedup_keys`` primary key with one query, so a restart or another
+    worker never means an OpenAI call for a known lead. If that query fails
+    the leads are treated as new; the `insert_leads` RPC still stores each
+    person only once.
+    """
+    found = {}
+    unknown = {}
+    for i, lead_keys in enumerate(keys):
+        lead_id = lead_index.probe(lead_keys)
+        if lead_id is not None:
+            found[i] = lead_id
+        else:
+            unknown[i] = lead_keys
+    if not unknown:
+        return found
+
+    try:
+        result = await execute(
+            supabase.table("lead_dedup_keys")
+            .select("key, lead_id")
+            .in_("key", list({key for lead_keys in unknown.values() for key in lead_keys}))
+        )
+    except Exception as e:
+        logger.warning(f"Duplicate lookup failed, scoring {len(unknown)} leads as new: {e}")
+        return found
+    owners = {row["key"]: row["lead_id"] for row in result.data}
+    for i, lead_keys in unknown.items():
+        lead_id = next((owners[key] for key in lead_keys if key in owners), None)
+        if lead_id is not None:
+            lead_index.add(lead_keys, lead_id)
+            found[i] = lead_id
+    return found
+
+async def insert_leads(rows: List[dict], keys: List[List[str]]) -> List[dict]:
+    """
+    Store leads unless they duplicate an existing one, in one round-trip.
+
+    Returns one ``{"duplicate": bool, "lead": row}`` per input; for a
+    duplicate ``lead`` is the row stored earlier.
+    """
+    result = await execute(supabase.rpc("insert_leads", {
+        "p_leads": [{"row": row, "keys": lead_keys} for row, lead_keys in zip(rows, keys)],
+    }))
+    for lead_keys, outcome in zip(keys, result.data):
+        lead_index.add(lead_keys, outcome["lead"]["id"])
+    return result.data
+
+async def fetch_leads(lead_ids: List[str]) -> Dict[str, dict]:
+    """Id, score and status of known duplicates, by id (never their contact details)"""
+    if not lead_ids:
+        return {}
+    result = await execute(supabase.table("leads").select("id, score, status").in_("id", list(set(lead_ids))))
+    return {row["id"]: row for row in result.data}
@@ -0,0 +1,89 @@
+import os
+import io
+import csv
+import zlib
+from typing import AsyncIterator, Callable, Iterable, List, Optional
+import orjson
+from ..db import supabase, execute, keyset_page, split_page
+
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Spreadsheets run a cell starting with one of these as a formula; lead
+# fields are submitted by the public, so such cells are quoted with "'"
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+async def iter_rows(
+    table: str,
+    columns: List[str],
+    apply_filters: Callable = lambda query: query,
+    order_column: str = "created_at",
+    page_size: Optional[int] = None,
+) -> AsyncIterator[list]:
+    """
+    Yield a table one keyset page at a time, newest first.
+
+    Only the current page is held in memory, so exports of any size run in
+    constant memory and each page query stays index-backed.
+    """
+    page_size = page_size or EXPORT_PAGE_SIZE
+    select = ",".join(dict.fromkeys(["id", order_column] + columns))
+    cursor = None
+    while True:
+        query = apply_filters(supabase.table(table).select(select))
+        result = await execute(keyset_page(query, cursor, page_size, order_column))
+        rows, cursor = split_page(result.data, page_size, order_column)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+def _encode_csv(rows: Iterable[dict], columns: List[str], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    writer.writerows({c: _cell(row.get(c)) for c in columns} for row in rows)
+    return buffer.getvalue().encode()
+
+def _cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def _encode_ndjson(rows: Iterable[dict], columns: List[str]) -> bytes:
+    return b"".join(
+        orjson.dumps({c: row.get(c) for c in columns}, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+async def stream_export(
+    pages: AsyncIterator[list],
+    columns: List[str],
+    fmt: str,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """Encode pages of rows as CSV or NDJSON chunks, optionally gzip-compressed"""
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    if fmt == "csv":
+        # Emit the header up front so even an empty export is valid CSV
+        chunk = _encode_csv([], columns, header=True)
+        yield compressor.compress(chunk) if compressor else chunk
+
+    async for rows in pages:
+        if fmt == "csv":
+            chunk = _encode_csv(rows, columns, header=False)
+        else:
+            chunk = _encode_ndjson(rows, columns)
+        if compressor:
+            chunk = compressor.compress(chunk)
+            if not chunk:
+                continue
+        yield chunk
+
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,91 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+# Higher tiers get first pick of leads in their area
+TIER_PRIORITY = {"enterprise": 3, "professional": 2, "starter": 1}
+
+# Service areas are matched on the 3-digit zip prefix (USPS sectional center)
+ZIP_PREFIX_LEN = 3
+
+NATIONWIDE = "*"
+
+class LeadRouter:
+    """
+    Matches leads to customers by service area, tier and remaining quota.
+
+    Built once per routing run from the active subscriptions:
+
+    * a zip-prefix index mapping each 3-digit prefix to a heap of customers
+      serving it (customers without service areas go in a nationwide heap
+      that is only used when no local customer has quota left);
+    * each heap is ordered by (tier priority, remaining included leads), so
+      the best candidate is always on top.
+
+    Heaps are updated lazily: an entry whose remaining quota no longer
+    matches the live count is re-pushed with the current value when popped.
+    Routing n leads across c customers costs O(n log c).
+    """
+
+    def __init__(self, subscriptions: List[dict]):
+        self.remaining: Dict[str, int] = {}
+        self.tier: Dict[str, str] = {}
+        self._heaps: Dict[str, list] = {}
+
+        for sub in subscriptions:
+            customer_id = sub["customer_id"]
+            remaining = sub["leads_included"] - sub["leads_used"]
+            if remaining <= 0:
+                continue
+            self.remaining[customer_id] = remaining
+            self.tier[customer_id] = sub["tier"]
+            prefixes = {p[:ZIP_PREFIX_LEN] for p in (sub.get("service_zip_prefixes") or [])}
+            for prefix in prefixes or {NATIONWIDE}:
+                self._heaps.setdefault(prefix, []).append(self._entry(customer_id))
+
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def _entry(self, customer_id: str) -> tuple:
+        return (-TIER_PRIORITY.get(self.tier[customer_id], 0), -self.remaining[customer_id], customer_id)
+
+    def _peek(self, prefix: str) -> Optional[tuple]:
+        """Top live entry of a prefix heap, discarding exhausted/stale entries"""
+        heap = self._heaps.get(prefix)
+        while heap:
+            _, neg_remaining, customer_id = heap[0]
+            remaining = self.remaining[customer_id]
+            if remaining <= 0:
+                heapq.heappop(heap)
+            elif -neg_remaining != remaining:
+                heapq.heapreplace(heap, self._entry(customer_id))
+            else:
+                return heap[0]
+        return None
+
+    def match(self, lead: dict) -> Optional[str]:
+        """Pick and reserve the best customer for one lead, or None"""
+        prefixes = {
+            (lead.get("origin_zip") or "")[:ZIP_PREFIX_LEN],
+            (lead.get("destination_zip") or "")[:ZIP_PREFIX_LEN],
+        }
+        candidates = [entry for entry in map(self._peek, prefixes) if entry]
+        if not candidates:
+            entry = self._peek(NATIONWIDE)
+            candidates = [entry] if entry else []
+        if not candidates:
+            return None
+
+        customer_id = min(candidates)[2]
+        self.remaining[customer_id] -= 1
+        return customer_id
+
+    def route(self, leads: List[dict]) -> Tuple[List[dict], List[str]]:
+        """Route leads in the given order; returns (assignments, unrouted lead ids)"""
+        assignments, unrouted = [], []
+        for lead in leads:
+            customer_id = self.match(lead)
+            if customer_id is None:
+                unrouted.append(lead["id"])
+            else:
+                assignments.append({"lead_id": lead["id"], "customer_id": customer_id})
+        return assignments, unrouted
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Optional
+from ..db import supabase, execute
+from ..models import RawLead
+from ..ai.scorer import analyze_lead
+from .analytics import analytics_snapshot
+
+logger = logging.getLogger(__name__)
+
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+SCORING_QUEUE_PATH = os.getenv("SCORING_QUEUE_PATH", "scoring_queue.db")
+SCORING_MAX_ATTEMPTS = int(os.getenv("SCORING_MAX_ATTEMPTS", "3"))
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+class DurableQueue:
+    """
+    SQLite-backed journal of leads waiting to be scored.
+
+    A job is written before the lead is acknowledged to the client and only
+    deleted once its score is saved, so anything still here after a restart
+    is re-enqueued.
+
+    Every worker process journals into the same file. Each job records the
+    pid that owns it, and a starting process only picks up jobs that are
+    unowned or whose owner has exited, so two live workers never score the
+    same lead.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scoring_jobs ("
+                "lead_id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "enqueued_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, owner INTEGER)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(scoring_jobs)")}
+            if "owner" not in columns:
+                self._db.execute("ALTER TABLE scoring_jobs ADD COLUMN owner INTEGER")
+        return self._db
+
+    def put(self, job: dict):
+        with self._lock:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO scoring_jobs (lead_id, payload, enqueued_at, attempts, owner) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job["lead_id"], json.dumps(job["payload"]), job["enqueued_at"], job["attempts"], os.getpid()),
+            )
+
+    def ack(self, lead_id: str):
+        with self._lock:
+            self._conn().execute("DELETE FROM scoring_jobs WHERE lead_id = ?", (lead_id,))
+
+    def pending(self) -> list:
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT lead_id, payload, enqueued_at, attempts FROM scoring_jobs ORDER BY enqueued_at"
+            ).fetchall()
+        return [
+            {"lead_id": r[0], "payload": json.loads(r[1]), "enqueued_at": r[2], "attempts": r[3]}
+            for r in rows
+        ]
+
+    def claim_orphans(self) -> list:
+        """
+        Take ownership of jobs left by this pid or by processes that exited
+        and return them, oldest first
+        """
+        pid = os.getpid()
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                owners = [r[0] for r in db.execute("SELECT DISTINCT owner FROM scoring_jobs")]
+                orphaned = [o for o in owners if o is None or o == pid or not _alive(o)]
+                rows = []
+                for owner in orphaned:
+                    if owner is None:
+                        where, params = "owner IS NULL", ()
+                    else:
+                        where, params = "owner = ?", (owner,)
+                    rows += db.execute(
+                        f"SELECT lead_id, payload, enqueued_at, attempts FROM scoring_jobs WHERE {where}", params
+                    ).fetchall()
+                    db.execute(f"UPDATE scoring_jobs SET owner = ? WHERE {where}", (pid, *params))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        rows.sort(key=lambda r: r[2])
+        return [
+            {"lead_id": r[0], "payload": json.loads(r[1]), "enqueued_at": r[2], "attempts": r[3]}
+            for r in rows
+        ]
+
+    def oldest(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn().execute("SELECT MIN(enqueued_at) FROM scoring_jobs").fetchone()
+        return row[0]
+
+class ScoringQueue:
+    """Background worker pool that scores pending leads and updates their rows"""
+
+    def __init__(self, path: str = SCORING_QUEUE_PATH, workers: int = SCORING_WORKERS):
+        self.durable = DurableQueue(path)
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.recovered = 0
+        self._last_wait = 0.0
+        self._total_wait = 0.0
+        self._attempts = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Re-enqueue orphaned journaled jobs and spawn the worker tasks"""
+        self._queue = asyncio.Queue()
+        for job in self.durable.claim_orphans():
+            self._queue.put_nowait(job)
+            self.recovered += 1
+        if self.recovered:
+            logger.info(f"Recovered {self.recovered} pending scoring jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def journal(self, lead_id: str, lead: RawLead) -> dict:
+        """Durably record a scoring job before the lead row is written"""
+        job = {
+            "lead_id": lead_id,
+            "payload": lead.model_dump(mode="json"),
+            "enqueued_at": time.time(),
+            "attempts": 0,
+        }
+        self.durable.put(job)
+        return job
+
+    def enqueue(self, job: dict):
+        """Hand a journaled job to the workers once its lead row exists"""
+        if self._queue is not None:
+            self._queue.put_nowait(job)
+
+    def discard(self, lead_id: str):
+        self.durable.ack(lead_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self.in_flight += 1
+            try:
+                await self._process(job)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _process(self, job: dict):
+        wait = time.time() - job["enqueued_at"]
+        self._last_wait = wait
+        self._total_wait += wait
+        self._attempts += 1
+
+        try:
+            ai_result = await analyze_lead(RawLead(**job["payload"]))
+            await execute(supabase.table("leads").update({
+                "score": ai_result.get("score", 0),
+                "reasoning": ai_result.get("reasoning", "No reasoning provided."),
+                "status": "available",
+            }).eq("id", job["lead_id"]))
+        except Exception as e:
+            job["attempts"] += 1
+            if job["attempts"] >= SCORING_MAX_ATTEMPTS:
+                # Leave it journaled so the next restart retries it
+                self.failed += 1
+                logger.error(f"Scoring job {job['lead_id']} failed {job['attempts']} times: {e}")
+                return
+            logger.warning(f"Scoring job {job['lead_id']} failed, retrying: {e}")
+            self.durable.put(job)
+            await asyncio.sleep(2 ** job["attempts"])
+            self._queue.put_nowait(job)
+            return
+
+        self.durable.ack(job["lead_id"])
+        self.processed += 1
+        analytics_snapshot.lead_scored()
+
+    def stats(self) -> dict:
+        oldest = self.durable.oldest()
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "recovered": self.recovered,
+            "oldest_pending_age_seconds": time.time() - oldest if oldest else 0.0,
+            "last_wait_seconds": self._last_wait,
+            "avg_wait_seconds": self._total_wait / self._attempts if self._attempts else 0.0,
+        }
+
+scoring_queue = ScoringQueue()
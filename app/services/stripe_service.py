@@ -1,16 +1,70 @@
 import os
-import stripe
-from dotenv import load_dotenv
+import json
+import uuid
+import hashlib
+import random
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+from ..clients import LazyClient
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-stripe_key = os.getenv("STRIPE_SECRET_KEY")
-if not stripe_key:
-    print("WARNING: STRIPE_SECRET_KEY not found in environment variables!")
-    print("Customer registration will fail. Please add STRIPE_SECRET_KEY to your .env file.")
-else:
-    stripe.api_key = stripe_key
-    print(f"✅ Stripe initialized with key: {stripe_key[:7]}...")
+def _configure_stripe():
+    """Import and configure the stripe SDK on first use"""
+    import stripe
+
+    stripe_key = os.getenv("STRIPE_SECRET_KEY")
+    if stripe_key:
+        stripe.api_key = stripe_key
+    else:
+        logger.warning("STRIPE_SECRET_KEY is not set; customer registration will fail")
+    # e.g. a local stripe-mock for load tests
+    if os.getenv("STRIPE_API_BASE"):
+        stripe.api_base = os.getenv("STRIPE_API_BASE")
+    return stripe
+
+# The stripe module itself, configured on first attribute access
+stripe = LazyClient("stripe", _configure_stripe)
+
+# The stripe SDK is synchronous; its calls run on a dedicated pool so they
+# never block the event loop or compete with Supabase calls for threads.
+STRIPE_MAX_WORKERS = int(os.getenv("STRIPE_MAX_WORKERS", "10"))
+STRIPE_MAX_RETRIES = int(os.getenv("STRIPE_MAX_RETRIES", "3"))
+STRIPE_RETRY_BASE_DELAY = float(os.getenv("STRIPE_RETRY_BASE_DELAY", "0.5"))
+STRIPE_PRICE_CACHE_PATH = os.getenv("STRIPE_PRICE_CACHE_PATH", "stripe_prices.json")
+
+_executor = ThreadPoolExecutor(max_workers=STRIPE_MAX_WORKERS, thread_name_prefix="stripe")
+
+def _retryable(error: Exception) -> bool:
+    """Transient failures worth retrying; everything else (card declined,
+    invalid request, auth) fails immediately"""
+    if isinstance(error, (stripe.APIConnectionError, stripe.RateLimitError)):
+        return True
+    return isinstance(error, stripe.APIError) and (error.http_status or 500) >= 500
+
+async def call_stripe(method, idempotency_key: Optional[str] = None, **params):
+    """
+    Run a blocking stripe SDK call off the event loop with bounded retries.
+
+    Every attempt reuses the same idempotency key, so a retry after a
+    timeout can never create a second customer, subscription or charge.
+    """
+    params["idempotency_key"] = idempotency_key or str(uuid.uuid4())
+    loop = asyncio.get_running_loop()
+
+    for attempt in range(STRIPE_MAX_RETRIES + 1):
+        try:
+            return await loop.run_in_executor(_executor, partial(method, **params))
+        except Exception as e:
+            if not _retryable(e) or attempt == STRIPE_MAX_RETRIES:
+                raise
+            # Exponential backoff with full jitter
+            delay = random.uniform(0, STRIPE_RETRY_BASE_DELAY * 2 ** attempt)
+            logger.warning(f"Stripe call failed ({e}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
 
 # Pricing tiers configuration
 PRICING_TIERS = {
@@ -31,10 +85,12 @@ PRICING_TIERS = {
     }
 }
 
-async def create_customer(email: str, company_name: str) -> dict:
+async def create_customer(email: str, company_name: str, idempotency_key: Optional[str] = None) -> dict:
     """Create a Stripe customer"""
     try:
-        customer = stripe.Customer.create(
+        customer = await call_stripe(
+            stripe.Customer.create,
+            idempotency_key=idempotency_key,
             email=email,
             name=company_name,
             metadata={"company_name": company_name}
@@ -44,31 +100,150 @@ async def create_customer(email: str, company_name: str) -> dict:
         print(f"Stripe customer creation error: {e}")
         return {"success": False, "error": str(e)}
 
-async def create_subscription(customer_id: str, tier: str) -> dict:
+def price_lookup_key(tier: str) -> str:
+    """
+    Stable Stripe lookup key for a tier's monthly price.
+
+    The amount is part of the key, so changing a tier's price in
+    PRICING_TIERS resolves to a new Price instead of a stale cached one.
+    """
+    return f"movescout_{tier}_{PRICING_TIERS[tier]['price']}_usd_monthly"
+
+def _account_scope() -> str:
+    """
+    The Stripe account and mode that IDs resolved now belong to.
+
+    A digest of the API key and base, so switching keys (test to live, or
+    another account) never reuses the old account's IDs; the key itself is
+    not written anywhere.
+    """
+    key = stripe.api_key or ""
+    mode = "live" if "_live_" in key else "test"
+    return f"{mode}-{hashlib.sha256(f'{stripe.api_base}|{key}'.encode()).hexdigest()[:12]}"
+
+class PriceCache:
+    """
+    Maps each pricing tier to a persistent Stripe Price ID.
+
+    Resolved once per account and lookup key: from memory, then from the
+    JSON file at ``path`` (so restarts skip the API entirely), then from
+    Stripe by lookup key, and only if none exists yet by creating the
+    Product and Price. Concurrent first requests for a tier share a single
+    resolution. A Price that Stripe no longer knows is dropped with `evict`.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._prices: Optional[Dict[str, str]] = None  # read from disk on first use
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._evicted: Dict[str, str] = {}
+
+    def _load(self) -> Dict[str, str]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable price cache {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._prices, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    async def get(self, tier: str) -> str:
+        if self._prices is None:
+            self._prices = self._load()
+        lookup_key = price_lookup_key(tier)
+        cache_key = f"{_account_scope()}/{lookup_key}"
+        price_id = self._prices.get(cache_key)
+        if price_id:
+            return price_id
+
+        pending = self._pending.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._resolve(tier, lookup_key, cache_key))
+            self._pending[cache_key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(cache_key, None))
+        return await asyncio.shield(pending)
+
+    async def _resolve(self, tier: str, lookup_key: str, cache_key: str) -> str:
+        existing = await call_stripe(stripe.Price.list, lookup_keys=[lookup_key], active=True, limit=1)
+        if existing.data:
+            price_id = existing.data[0].id
+        else:
+            price = await call_stripe(
+                stripe.Price.create,
+                # Deterministic key: two workers racing here create one Price.
+                # A replacement gets its own, or Stripe would replay the old one.
+                idempotency_key="-".join(filter(None, ["price", lookup_key, self._evicted.get(cache_key)])),
+                currency="usd",
+                unit_amount=PRICING_TIERS[tier]["price"] * 100,  # Stripe uses cents
+                recurring={"interval": "month"},
+                product_data={"name": f"{tier.capitalize()} Plan"},
+                lookup_key=lookup_key,
+                metadata={"tier": tier},
+            )
+            price_id = price.id
+            logger.info(f"Created Stripe price {price_id} for {tier} tier")
+
+        self._prices[cache_key] = price_id
+        self._save()
+        return price_id
+
+    def evict(self, tier: str, price_id: str):
+        """Forget ``price_id`` for the tier so the next `get` resolves it again"""
+        cache_key = f"{_account_scope()}/{price_lookup_key(tier)}"
+        self._evicted[cache_key] = price_id
+        if self._prices and self._prices.get(cache_key) == price_id:
+            del self._prices[cache_key]
+            self._save()
+
+    def clear(self):
+        self._prices = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+price_cache = PriceCache(STRIPE_PRICE_CACHE_PATH)
+
+async def get_price_id(tier: str) -> str:
+    """Stripe Price ID for a tier, resolved once and cached"""
+    return await price_cache.get(tier)
+
+async def create_subscription(customer_id: str, tier: str, idempotency_key: Optional[str] = None) -> dict:
     """Create a Stripe subscription for a customer"""
     if tier not in PRICING_TIERS:
         return {"success": False, "error": "Invalid tier"}
     
-    try:
-        # In production, you'd create a Stripe Price/Product first
-        # For now, we'll use a simple subscription without a product
-        subscription = stripe.Subscription.create(
+    async def subscribe(price_id: str):
+        return await call_stripe(
+            stripe.Subscription.create,
+            idempotency_key=idempotency_key,
             customer=customer_id,
-            items=[{
-                "price_data": {
-                    "currency": "usd",
-                    "product_data": {
-                        "name": f"{tier.capitalize()} Plan"
-                    },
-                    "unit_amount": PRICING_TIERS[tier]["price"] * 100,  # Stripe uses cents
-                    "recurring": {"interval": "month"}
-                }
-            }],
+            items=[{"price": price_id}],
             metadata={
                 "tier": tier,
                 "leads_included": PRICING_TIERS[tier]["leads_included"]
             }
         )
+
+    try:
+        price_id = await get_price_id(tier)
+        try:
+            subscription = await subscribe(price_id)
+        except stripe.InvalidRequestError as e:
+            if e.code != "resource_missing" or "price" not in (e.param or ""):
+                raise
+            # Deleted in Stripe, or cached before a switch of keys: resolve
+            # again. Stripe saves no idempotent result for a rejected request.
+            logger.warning(f"Stripe price {price_id} for {tier} tier is gone; resolving it again")
+            price_cache.evict(tier, price_id)
+            subscription = await subscribe(await get_price_id(tier))
         return {
             "success": True,
             "subscription_id": subscription.id,
@@ -78,7 +253,7 @@ async def create_subscription(customer_id: str, tier: str) -> dict:
         print(f"Stripe subscription creation error: {e}")
         return {"success": False, "error": str(e)}
 
-async def charge_overage(customer_id: str, num_leads: int, tier: str) -> dict:
+async def charge_overage(customer_id: str, num_leads: int, tier: str, idempotency_key: Optional[str] = None) -> dict:
     """Charge for overage leads"""
     if tier not in PRICING_TIERS:
         return {"success": False, "error": "Invalid tier"}
@@ -86,7 +261,9 @@ async def charge_overage(customer_id: str, num_leads: int, tier: str) -> dict:
     amount = num_leads * PRICING_TIERS[tier]["overage_price"]
     
     try:
-        charge = stripe.PaymentIntent.create(
+        charge = await call_stripe(
+            stripe.PaymentIntent.create,
+            idempotency_key=idempotency_key,
             amount=int(amount * 100),  # Convert to cents
             currency="usd",
             customer=customer_id,
@@ -97,3 +274,22 @@ async def charge_overage(customer_id: str, num_leads: int, tier: str) -> dict:
     except Exception as e:
         print(f"Stripe overage charge error: {e}")
         return {"success": False, "error": str(e)}
+
+async def charge_overages(charges: List[dict], max_concurrency: int = STRIPE_MAX_WORKERS) -> List[dict]:
+    """
+    Charge many customers concurrently.
+
+    Each item has customer_id, num_leads, tier and an idempotency_key (so a
+    re-run of the same billing cycle charges nobody twice). Results are
+    returned in input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def charge(item: dict) -> dict:
+        async with semaphore:
+            return await charge_overage(
+                item["customer_id"], item["num_leads"], item["tier"],
+                idempotency_key=item.get("idempotency_key"),
+            )
+
+    return await asyncio.gather(*(charge(item) for item in charges))
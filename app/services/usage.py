@@ -0,0 +1,103 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+from ..db import supabase, execute
+from ..shared import generations
+
+# Safety net for writes that bypass the app (manual edits, Stripe dashboard)
+USAGE_CACHE_TTL = float(os.getenv("USAGE_CACHE_TTL", "300"))
+USAGE_CACHE_SIZE = int(os.getenv("USAGE_CACHE_SIZE", "10000"))
+
+USAGE_FIELDS = "id, tier, leads_included, leads_used"
+
+async def fetch_usage(customer_id: str) -> Optional[dict]:
+    """The customer's active subscription counters, or None"""
+    result = await execute(
+        supabase.table("subscriptions")
+        .select(USAGE_FIELDS)
+        .eq("customer_id", customer_id)
+        .eq("status", "active")
+        .limit(1)
+    )
+    return result.data[0] if result.data else None
+
+class UsageCache:
+    """
+    In-memory per-customer subscription usage.
+
+    Entries are loaded from the DB on a miss and then kept current by
+    `lead_assigned`, which writes through the ``leads_used`` value returned
+    by the assign_lead RPC, so portal polls never reach the DB while the app
+    is the only writer. Subscription changes call `invalidate`.
+
+    Each write bumps a per-customer generation shared by all worker
+    processes (see ``app/shared.py``); a cached entry older than the current
+    generation was changed by another worker and is reloaded. ``ttl`` bounds
+    staleness from writes made outside the app.
+    """
+
+    def __init__(self, ttl: float = USAGE_CACHE_TTL, max_size: int = USAGE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        # customer_id -> (generation, loaded_at, usage)
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, customer_id: str) -> Optional[dict]:
+        generation = generations.get(_key(customer_id))
+        entry = self._entries.get(customer_id)
+        if entry is not None:
+            seen, loaded_at, usage = entry
+            if seen == generation and time.monotonic() - loaded_at <= self.ttl:
+                self._entries.move_to_end(customer_id)
+                self.hits += 1
+                return dict(usage)
+
+        self.misses += 1
+        usage = await fetch_usage(customer_id)
+        if usage is None:
+            # Not cached: registering a subscription must be visible at once
+            self._entries.pop(customer_id, None)
+            return None
+        self._store(customer_id, generation, time.monotonic(), usage)
+        return dict(usage)
+
+    def _store(self, customer_id: str, generation: int, loaded_at: float, usage: dict):
+        self._entries[customer_id] = (generation, loaded_at, usage)
+        self._entries.move_to_end(customer_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def lead_assigned(self, customer_id: str, result: dict):
+        """Write through the counters returned by a successful assign_lead RPC"""
+        generation = generations.bump(_key(customer_id))
+        entry = self._entries.get(customer_id)
+        if entry is None:
+            return
+        seen, loaded_at, usage = entry
+        if seen != generation - 1 or usage["id"] != result.get("subscription_id"):
+            # Another worker assigned in between, or the subscription changed
+            del self._entries[customer_id]
+            return
+        usage = {
+            **usage,
+            # Concurrent assignments can finish out of order; usage only grows
+            "leads_used": max(usage["leads_used"], result["leads_used"]),
+            "leads_included": result["leads_included"],
+        }
+        self._store(customer_id, generation, loaded_at, usage)
+
+    def invalidate(self, customer_id: str):
+        """Drop the customer's entry here and in every other worker"""
+        generations.bump(_key(customer_id))
+        self._entries.pop(customer_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+def _key(customer_id: str) -> str:
+    return f"usage:{customer_id}"
+
+usage_cache = UsageCache()
@@ -0,0 +1,77 @@
+import os
+import logging
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of server worker processes (set by gunicorn.conf.py; 1 under plain uvicorn)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or "1")
+
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "shared_state.db")
+
+def per_worker(total: float) -> int:
+    """
+    One worker's share of a budget meant for the whole server.
+
+    Limits such as OpenAI concurrency and tokens per minute are enforced
+    in-process; dividing them evenly keeps N workers inside the account-wide
+    limit instead of each spending all of it. Every worker needs at least
+    1, so with more workers than ``total`` the server as a whole exceeds it;
+    that is logged, and the fix is fewer workers or a bigger budget.
+    """
+    if total < WEB_CONCURRENCY:
+        logger.warning(
+            f"Budget of {total:g} is less than one per worker: {WEB_CONCURRENCY} workers "
+            f"will use up to {WEB_CONCURRENCY}; lower WEB_CONCURRENCY to stay within it"
+        )
+    return max(1, int(total // WEB_CONCURRENCY))
+
+class Generations:
+    """
+    Change counters shared by every worker process.
+
+    A worker that changes some shared data bumps its counter; a worker holding
+    a local copy compares the counter with the value it last saw to know the
+    copy is stale. Backed by a small SQLite file when the server runs several
+    workers, and by a plain dict otherwise.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._db = None
+        self._local: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS generations (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+        return self._db
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            if not self.path:
+                return self._local.get(name, 0)
+            row = self._conn().execute("SELECT value FROM generations WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, name: str) -> int:
+        """Increment and return the new value"""
+        with self._lock:
+            if not self.path:
+                self._local[name] = self._local.get(name, 0) + 1
+                return self._local[name]
+            row = self._conn().execute(
+                "INSERT INTO generations (name, value) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1 RETURNING value",
+                (name,),
+            ).fetchone()
+        return row[0]
+
+generations = Generations(SHARED_STATE_PATH if WEB_CONCURRENCY > 1 else None)
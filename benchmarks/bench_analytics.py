@@ -0,0 +1,102 @@
+"""
+/admin/analytics cost vs table size: pulling whole tables vs DB-side RPC.
+
+Seeds the local PostgREST stand-in with growing numbers of leads and
+purchases and times the legacy implementation (select every row, count in
+Python) against ``fetch_analytics`` (one ``admin_analytics`` RPC), reporting
+latency and bytes transferred per call.
+
+    python -m benchmarks.bench_analytics --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from .fakes import FakePostgrest, ServerThread
+
+TIERS = ["starter", "professional", "enterprise"]
+
+
+def seed(fake: FakePostgrest, leads: int):
+    rng = random.Random(1)
+    fake.tables.clear()
+    customers = [{"company_name": f"Movers {i}", "email": f"c{i}@example.com"} for i in range(200)]
+    fake.seed("customers", customers)
+    fake.seed("subscriptions", [
+        {"customer_id": c["id"], "tier": rng.choice(TIERS), "status": "active",
+         "leads_included": 30, "leads_used": 0}
+        for c in customers
+    ])
+    fake.seed("leads", [
+        {"full_name": f"Lead {i}", "status": rng.choice(["available", "sold"]), "score": rng.randint(0, 100)}
+        for i in range(leads)
+    ])
+    fake.seed("lead_purchases", [
+        {"purchase_type": rng.choice(["included", "overage"]), "price_paid": rng.choice([0, 8, 10, 12])}
+        for _ in range(leads // 2)
+    ])
+
+
+async def legacy_analytics() -> dict:
+    """The pre-RPC implementation: fetch rows and aggregate in Python"""
+    from app.db import supabase, execute
+    from app.services.stripe_service import PRICING_TIERS
+
+    customers = await execute(supabase.table("customers").select("id"))
+    active_subs = await execute(supabase.table("subscriptions").select("*").eq("status", "active"))
+    mrr = sum(PRICING_TIERS[sub["tier"]]["price"] for sub in active_subs.data)
+    leads = await execute(supabase.table("leads").select("id, status"))
+    purchases = await execute(
+        supabase.table("lead_purchases").select("price_paid").eq("purchase_type", "overage")
+    )
+    overage_revenue = sum(p["price_paid"] for p in purchases.data)
+    return {
+        "total_customers": len(customers.data),
+        "active_subscriptions": len(active_subs.data),
+        "monthly_recurring_revenue": mrr,
+        "total_leads": len(leads.data),
+        "available_leads": len([l for l in leads.data if l.get("status") == "available"]),
+        "sold_leads": len([l for l in leads.data if l.get("status") == "sold"]),
+        "overage_revenue": overage_revenue,
+        "total_revenue": mrr + overage_revenue,
+    }
+
+
+async def measure(fake: FakePostgrest, fn, repeat: int):
+    start_bytes = fake.bytes_sent
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = await fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    return result, elapsed * 1000, (fake.bytes_sent - start_bytes) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fake = FakePostgrest()
+    with ServerThread(fake.app) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ.setdefault("SUPABASE_KEY", "bench-key")
+        os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+        from app.services.analytics import fetch_analytics
+
+        print(f"{'leads':>8} | {'legacy ms':>10} {'legacy KB':>10} | {'rpc ms':>8} {'rpc KB':>7}")
+        for size in args.sizes:
+            seed(fake, size)
+            legacy, legacy_ms, legacy_bytes = asyncio.run(measure(fake, legacy_analytics, args.repeat))
+            rpc, rpc_ms, rpc_bytes = asyncio.run(measure(fake, fetch_analytics, args.repeat))
+            assert legacy == rpc, (legacy, rpc)
+            print(
+                f"{size:>8} | {legacy_ms:>10.1f} {legacy_bytes / 1024:>10.1f} | "
+                f"{rpc_ms:>8.1f} {rpc_bytes / 1024:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
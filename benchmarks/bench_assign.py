@@ -0,0 +1,102 @@
+"""
+Lead assignment under concurrency: legacy 4 round-trips vs one RPC.
+
+Fires concurrent assignments (each lead requested ``--dupes`` times) against
+the local PostgREST stand-in with injected latency and reports throughput,
+lost ``leads_used`` increments and leads sold more than once.
+
+    python -m benchmarks.bench_assign --leads 200 --latency 0.01
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+from .fakes import FakePostgrest, ServerThread
+
+CUSTOMER_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def seed(fake: FakePostgrest, leads: int):
+    fake.tables.clear()
+    fake.seed("subscriptions", [{
+        "customer_id": CUSTOMER_ID, "tier": "starter", "status": "active",
+        "leads_included": 30, "leads_used": 0,
+    }])
+    fake.seed("leads", [{"full_name": f"Lead {i}", "status": "available"} for i in range(leads)])
+
+
+async def legacy_assign(lead_id: str) -> bool:
+    """The pre-RPC flow: read subscription, update lead, insert purchase, write leads_used"""
+    from app.db import supabase, execute
+    from app.services.stripe_service import PRICING_TIERS
+
+    subscription = await execute(
+        supabase.table("subscriptions").select("*")
+        .eq("customer_id", CUSTOMER_ID).eq("status", "active")
+    )
+    sub = subscription.data[0]
+    is_overage = sub["leads_used"] >= sub["leads_included"]
+    await execute(supabase.table("leads").update({"status": "sold", "assigned_to": CUSTOMER_ID}).eq("id", lead_id))
+    await execute(supabase.table("lead_purchases").insert({
+        "lead_id": lead_id, "customer_id": CUSTOMER_ID,
+        "purchase_type": "overage" if is_overage else "included",
+        "price_paid": PRICING_TIERS[sub["tier"]]["overage_price"] if is_overage else 0,
+    }))
+    await execute(supabase.table("subscriptions").update({"leads_used": sub["leads_used"] + 1}).eq("id", sub["id"]))
+    return True
+
+
+async def rpc_assign(lead_id: str) -> bool:
+    from app.db import supabase, execute
+    from app.services.stripe_service import PRICING_TIERS
+
+    response = await execute(supabase.rpc("assign_lead", {
+        "p_lead_id": lead_id,
+        "p_customer_id": CUSTOMER_ID,
+        "p_overage_prices": {t: p["overage_price"] for t, p in PRICING_TIERS.items()},
+    }))
+    return response.data["success"]
+
+
+async def run(fake: FakePostgrest, assign, dupes: int) -> dict:
+    lead_ids = [lead["id"] for lead in fake.rows("leads")] * dupes
+    start = time.perf_counter()
+    results = await asyncio.gather(*(assign(lead_id) for lead_id in lead_ids))
+    elapsed = time.perf_counter() - start
+
+    successes = sum(results)
+    sold_counts = Counter(p["lead_id"] for p in fake.rows("lead_purchases"))
+    return {
+        "assignments_per_sec": successes / elapsed,
+        "successes": successes,
+        "lost_updates": len(fake.rows("lead_purchases")) - fake.rows("subscriptions")[0]["leads_used"],
+        "double_sold": sum(1 for n in sold_counts.values() if n > 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leads", type=int, default=200)
+    parser.add_argument("--dupes", type=int, default=2, help="concurrent requests per lead")
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    fake = FakePostgrest(latency=args.latency)
+    with ServerThread(fake.app) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ.setdefault("SUPABASE_KEY", "bench-key")
+        os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+        for name, assign in (("legacy", legacy_assign), ("rpc", rpc_assign)):
+            seed(fake, args.leads)
+            r = asyncio.run(run(fake, assign, args.dupes))
+            print(
+                f"{name:>6}: {r['assignments_per_sec']:7.1f} assignments/s  "
+                f"successes {r['successes']:5d}  lost updates {r['lost_updates']:5d}  "
+                f"double-sold leads {r['double_sold']:5d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
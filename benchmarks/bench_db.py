@@ -0,0 +1,90 @@
+"""
+Concurrent Supabase throughput: inline ``.execute()`` vs ``app.db.execute``.
+
+Boots a local PostgREST stand-in with injected latency, points the real
+supabase client at it and fires concurrent lead inserts from one event loop,
+once the old way (blocking call inside a coroutine) and once through the
+thread-pool data-access layer.
+
+    python -m benchmarks.bench_db --requests 200 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from .fakes import FakePostgrest, ServerThread
+
+LEAD = {
+    "full_name": "Bench Lead",
+    "email": "bench@example.com",
+    "phone": "555-0100",
+    "move_date": "2030-01-01",
+    "origin_zip": "10001",
+    "destination_zip": "90210",
+    "home_size": "2BR",
+    "budget": "5000",
+    "urgency": "High",
+    "score": 80,
+    "reasoning": "benchmark",
+}
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode: str, total: int) -> dict:
+    from app.db import supabase, execute
+
+    async def blocking():
+        supabase.table("leads").insert(dict(LEAD)).execute()
+
+    async def offloaded():
+        await execute(supabase.table("leads").insert(dict(LEAD)))
+
+    op = blocking if mode == "blocking" else offloaded
+    latencies = []
+
+    async def timed():
+        start = time.perf_counter()
+        await op()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "requests": total,
+        "seconds": elapsed,
+        "throughput": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="injected PostgREST latency (s)")
+    args = parser.parse_args()
+
+    fake = FakePostgrest(latency=args.latency)
+    with ServerThread(fake.app) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ.setdefault("SUPABASE_KEY", "bench-key")
+        for mode in ("blocking", "offloaded"):
+            r = asyncio.run(run(mode, args.requests))
+            print(
+                f"{r['mode']:>10}: {r['throughput']:8.1f} req/s  "
+                f"p50 {r['p50_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms  "
+                f"({r['requests']} requests in {r['seconds']:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Streaming export memory: peak allocations vs number of exported leads.
+
+Seeds the local PostgREST stand-in and drains ``stream_export`` for growing
+table sizes under tracemalloc. Peak memory should stay roughly flat, bounded
+by one page (EXPORT_PAGE_SIZE rows) rather than the whole table.
+
+    python -m benchmarks.bench_export --sizes 5000 20000 50000
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+from .fakes import FakePostgrest, ServerThread
+
+
+async def drain(columns, fmt: str, gzip: bool) -> int:
+    from app.services.export import iter_rows, stream_export
+
+    total = 0
+    async for chunk in stream_export(iter_rows("leads", columns), columns, fmt, gzip=gzip):
+        total += len(chunk)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000])
+    parser.add_argument("--format", default="csv", choices=["csv", "ndjson"])
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    fake = FakePostgrest()
+    with ServerThread(fake.app) as server:
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ.setdefault("SUPABASE_KEY", "bench-key")
+        os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+        from app.routes.admin import DEFAULT_LEAD_FIELDS
+
+        columns = list(DEFAULT_LEAD_FIELDS)
+        print(f"{'leads':>8} | {'output MB':>9} {'seconds':>8} {'peak MB':>8}")
+        for size in args.sizes:
+            fake.tables.clear()
+            fake.seed("leads", [
+                {"full_name": f"Lead {i}", "email": f"lead{i}@example.com", "score": i % 100,
+                 "status": "available", "move_date": "2030-01-01"}
+                for i in range(size)
+            ])
+            tracemalloc.start()
+            start = time.perf_counter()
+            written = asyncio.run(drain(columns, args.format, args.gzip))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{size:>8} | {written / 1e6:>9.1f} {elapsed:>8.2f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
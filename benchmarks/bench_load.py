@@ -0,0 +1,260 @@
+"""
+End-to-end load test of the API against local Supabase, OpenAI and Stripe stand-ins.
+
+Boots the real FastAPI app under uvicorn with every external service replaced
+by a fake from ``benchmarks/fakes.py`` (each with its own injected latency),
+seeds the fake database, then drives each scenario with ``--concurrency``
+closed-loop clients and reports throughput, error count and p50/p95/p99.
+
+Results are saved as JSON under ``benchmarks/results/`` named after the
+current commit, so a later run can be compared with ``--compare <commit>``.
+
+    python -m benchmarks.bench_load --requests 500 --concurrency 50
+    python -m benchmarks.bench_load --scenarios score analytics --compare 47e74bf
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+from .bench_db import percentile
+from .fakes import FakeOpenAI, FakePostgrest, FakeStripe, ServerThread
+
+RESULTS_DIR = Path(__file__).parent / "results"
+ADMIN_AUTH = ("admin", "changeme")
+TIERS = ["starter", "professional", "enterprise"]
+URGENCIES = ["ASAP", "High", "Within a month", "Flexible", "Not sure"]
+SIZES = ["Studio", "1BR", "2BR", "3BR", "4BR", "5BR"]
+BUDGETS = ["1500", "$3,000", "5k", "8000", "12000", "", "unknown"]
+
+
+def random_lead(rng: random.Random, i: int) -> dict:
+    return {
+        "full_name": f"Load Lead {i}",
+        "email": f"load{i}@example.com",
+        "phone": f"555-{i % 10**7:07d}",
+        "move_date": (date.today() + timedelta(days=rng.randint(-10, 200))).isoformat(),
+        "origin_zip": f"{rng.randint(10000, 99999)}",
+        "destination_zip": f"{rng.randint(10000, 99999)}",
+        "home_size": rng.choice(SIZES),
+        "budget": rng.choice(BUDGETS),
+        "urgency": rng.choice(URGENCIES),
+    }
+
+
+def seed(fake: FakePostgrest, leads: int, customers: int):
+    rng = random.Random(17)
+    now = datetime.now(timezone.utc)
+    fake.tables.clear()
+    fake.seed("leads", [
+        {
+            **random_lead(rng, i),
+            "score": rng.randint(0, 100),
+            "reasoning": "Seeded lead",
+            "status": rng.choice(["available", "available", "sold"]),
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(leads)
+    ])
+    fake.seed("customers", [
+        {"company_name": f"Movers {i}", "email": f"movers{i}@example.com"} for i in range(customers)
+    ])
+    fake.seed("subscriptions", [
+        {
+            "customer_id": customer["id"], "tier": rng.choice(TIERS), "status": "active",
+            "leads_included": 30, "leads_used": rng.randint(0, 40),
+        }
+        for customer in fake.rows("customers")
+    ])
+    fake.seed("lead_purchases", [
+        {"lead_id": lead["id"], "customer_id": fake.rows("customers")[0]["id"],
+         "purchase_type": "included", "price_paid": 0}
+        for lead in fake.rows("leads") if lead["status"] == "sold"
+    ])
+
+
+def scenarios(rng: random.Random) -> dict:
+    """Scenario name -> coroutine factory issuing one request with a shared client"""
+    counter = iter(range(10**9))
+    cursors = []
+
+    async def score(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/leads/score", json=random_lead(rng, next(counter)))
+
+    async def admin_leads(client: httpx.AsyncClient) -> httpx.Response:
+        # Mix first pages with follow-up pages from earlier responses
+        params = {"limit": 50}
+        if cursors and rng.random() < 0.5:
+            params["cursor"] = cursors.pop()
+        response = await client.get("/admin/leads", params=params, auth=ADMIN_AUTH)
+        if response.status_code == 200 and response.json().get("next_cursor"):
+            cursors.append(response.json()["next_cursor"])
+        return response
+
+    async def analytics(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/admin/analytics", auth=ADMIN_AUTH)
+
+    async def register(client: httpx.AsyncClient) -> httpx.Response:
+        n = next(counter)
+        return await client.post("/customers/register", json={
+            "company_name": f"Load Movers {n}",
+            "email": f"load-movers{n}@example.com",
+            "tier": rng.choice(TIERS),
+        })
+
+    return {"score": score, "admin_leads": admin_leads, "analytics": analytics, "register": register}
+
+
+async def drive(base_url: str, request, total: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=60,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await request(client)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append(time.perf_counter() - start)
+                errors += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def git_revision() -> str:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_baseline(ref: str) -> dict:
+    path = Path(ref) if ref.endswith(".json") else RESULTS_DIR / f"{ref}.json"
+    return json.loads(path.read_text())["results"]
+
+
+def report(results: dict, baseline: dict = None):
+    print(f"{'scenario':>12} | {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for name, r in results.items():
+        print(
+            f"{name:>12} | {r['throughput']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+            f"{r['p99_ms']:>8.1f} {r['errors']:>6}"
+        )
+        if baseline and name in baseline:
+            b = baseline[name]
+
+            def change(key):
+                return f"{(r[key] - b[key]) / b[key] * 100:+.0f}%" if b[key] else "n/a"
+
+            print(
+                f"{'vs base':>12} | {change('throughput'):>8} {change('p50_ms'):>8} "
+                f"{change('p95_ms'):>8} {change('p99_ms'):>8}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", default=["score", "admin_leads", "analytics", "register"],
+                        choices=["score", "admin_leads", "analytics", "register"])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-latency", type=float, default=0.01)
+    parser.add_argument("--openai-latency", type=float, default=0.3)
+    parser.add_argument("--openai-token-latency", type=float, default=0.005)
+    parser.add_argument("--stripe-latency", type=float, default=0.1)
+    parser.add_argument("--seed-leads", type=int, default=5000)
+    parser.add_argument("--seed-customers", type=int, default=200)
+    parser.add_argument("--compare", metavar="COMMIT_OR_FILE", help="saved result to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    db = FakePostgrest(latency=args.db_latency)
+    openai_fake = FakeOpenAI(latency=args.openai_latency, token_latency=args.openai_token_latency)
+    stripe_fake = FakeStripe(latency=args.stripe_latency)
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+
+    with ServerThread(db.app) as db_server, \
+            ServerThread(openai_fake.app) as openai_server, \
+            ServerThread(stripe_fake.app) as stripe_server:
+        os.environ.update({
+            "SUPABASE_URL": db_server.url,
+            "SUPABASE_KEY": "bench-key",
+            "OPENAI_API_KEY": "bench-key",
+            "OPENAI_BASE_URL": f"{openai_server.url}/v1",
+            "STRIPE_SECRET_KEY": "sk_test_bench",
+            "STRIPE_API_BASE": stripe_server.url,
+            "SCORE_CACHE_PATH": "",
+            "SCORING_QUEUE_PATH": os.path.join(workdir, "queue.db"),
+            "STRIPE_PRICE_CACHE_PATH": os.path.join(workdir, "prices.json"),
+        })
+        # Measure the app, not our own OpenAI budget, unless asked to
+        os.environ.setdefault("OPENAI_TOKENS_PER_MINUTE", "100000000")
+        os.environ.setdefault("OPENAI_MAX_CONCURRENCY", str(args.concurrency))
+
+        from app.main import app
+
+        # Per-request INFO logs from the app and SDKs would dominate the output
+        logging.getLogger().setLevel(logging.WARNING)
+
+        seed(db, args.seed_leads, args.seed_customers)
+
+        results = {}
+        rng = random.Random(42)
+        requests = scenarios(rng)
+        with ServerThread(app) as app_server:
+            for name in args.scenarios:
+                results[name] = asyncio.run(drive(app_server.url, requests[name], args.requests, args.concurrency))
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    report(results, baseline)
+
+    if not args.no_save:
+        revision = git_revision()
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{revision}.json"
+        path.write_text(json.dumps({
+            "revision": revision,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "config": vars(args),
+            "results": results,
+        }, indent=2))
+        print(f"saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Rule-based fast path: per-lead latency and escalation rate.
+
+Generates a synthetic mix of leads (random dates, sizes, budgets, urgency and
+a share of junk) and reports how long ``prescore`` takes per lead and what
+fraction would still be escalated to OpenAI at the configured thresholds.
+
+    python -m benchmarks.bench_prescorer --leads 50000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.models import RawLead
+from app.ai.prescorer import prescore, FASTPATH_JUNK_THRESHOLD, FASTPATH_HOT_THRESHOLD
+
+SIZES = ["Studio", "1BR", "2 Bedroom Apt", "3BR House", "4 bedroom", "5BR", "large house"]
+BUDGETS = ["$1,500", "3000", "5k", "$8,000", "12000", "", "not sure", "2000-3000"]
+URGENCY = ["ASAP", "High", "Medium", "Soon", "Flexible", "Low", "next month", "?"]
+
+
+def synthetic_leads(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    today = date.today()
+    leads = []
+    for i in range(count):
+        origin = f"{rng.randint(10000, 99999)}"
+        leads.append(RawLead(
+            full_name=f"Lead {i}",
+            email=f"lead{i}@example.com",
+            phone="555-0100",
+            move_date=today + timedelta(days=rng.randint(-30, 240)),
+            origin_zip=origin,
+            destination_zip=origin if rng.random() < 0.05 else f"{rng.randint(10000, 99999)}",
+            home_size=rng.choice(SIZES),
+            budget=rng.choice(BUDGETS),
+            urgency=rng.choice(URGENCY),
+        ))
+    return leads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leads", type=int, default=50000)
+    args = parser.parse_args()
+
+    leads = synthetic_leads(args.leads)
+    start = time.perf_counter()
+    scores = [prescore(lead)[0] for lead in leads]
+    elapsed = time.perf_counter() - start
+
+    escalated = sum(FASTPATH_JUNK_THRESHOLD < s < FASTPATH_HOT_THRESHOLD for s in scores)
+    print(f"prescore: {elapsed / len(leads) * 1e6:.1f} us/lead ({len(leads)} leads)")
+    print(
+        f"thresholds junk<={FASTPATH_JUNK_THRESHOLD} hot>={FASTPATH_HOT_THRESHOLD}: "
+        f"escalation rate {escalated / len(leads):.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
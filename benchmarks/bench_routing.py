@@ -0,0 +1,64 @@
+"""
+Routing engine throughput: index build + route time for synthetic traffic.
+
+    python -m benchmarks.bench_routing --customers 500 --leads 5000
+"""
+import argparse
+import random
+import time
+
+from app.services.routing import LeadRouter
+
+TIERS = ["starter", "professional", "enterprise"]
+INCLUDED = {"starter": 30, "professional": 75, "enterprise": 150}
+
+
+def synthetic(customers: int, leads: int, seed: int = 3):
+    rng = random.Random(seed)
+    prefixes = [f"{p:03d}" for p in rng.sample(range(100, 1000), 150)]
+    subs = []
+    for i in range(customers):
+        tier = rng.choice(TIERS)
+        subs.append({
+            "customer_id": f"c{i}",
+            "tier": tier,
+            "leads_included": INCLUDED[tier],
+            "leads_used": rng.randint(0, INCLUDED[tier]),
+            # A few customers take leads from anywhere
+            "service_zip_prefixes": [] if rng.random() < 0.05 else rng.sample(prefixes, rng.randint(1, 6)),
+        })
+    lead_rows = [
+        {
+            "id": f"l{i}",
+            "origin_zip": rng.choice(prefixes) + f"{rng.randint(0, 99):02d}",
+            "destination_zip": rng.choice(prefixes) + f"{rng.randint(0, 99):02d}",
+        }
+        for i in range(leads)
+    ]
+    return subs, lead_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--leads", type=int, default=5000)
+    args = parser.parse_args()
+
+    subs, leads = synthetic(args.customers, args.leads)
+
+    start = time.perf_counter()
+    router = LeadRouter(subs)
+    built = time.perf_counter()
+    assignments, unrouted = router.route(leads)
+    done = time.perf_counter()
+
+    print(f"index build: {(built - start) * 1000:7.2f} ms ({args.customers} customers)")
+    print(
+        f"routing:     {(done - built) * 1000:7.2f} ms for {args.leads} leads "
+        f"({args.leads / (done - built):,.0f} leads/s), "
+        f"{len(assignments)} routed, {len(unrouted)} unrouted"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+OpenAI scoring cost: one verbose prompt per lead vs packed requests.
+
+Scores the same ambiguous leads (all escalate past the fast path) against
+the local fake OpenAI server and reports requests, prompt/completion tokens
+per lead and leads per second for each pack size.
+
+    python -m benchmarks.bench_scoring --leads 200 --pack-sizes 1 5 10 20
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from .fakes import FakeOpenAI, ServerThread
+
+
+def leads(n: int) -> list:
+    from app.models import RawLead
+
+    return [
+        RawLead(
+            full_name=f"Lead {i}", email=f"lead{i}@example.com", phone="555-0100",
+            move_date="2030-10-01", origin_zip=f"{10001 + i % 50}", destination_zip="94105",
+            home_size=f"{2 + i % 2}BR", budget=str(5000 + i), urgency="High",
+        )
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leads", type=int, default=200)
+    parser.add_argument("--pack-sizes", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--latency", type=float, default=0.3, help="per-request model latency")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds per generated token")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(latency=args.latency, token_latency=args.token_latency)
+    with ServerThread(fake.app) as server:
+        os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:1")
+        os.environ.setdefault("SUPABASE_KEY", "bench-key")
+        os.environ["OPENAI_API_KEY"] = "bench-key"
+        os.environ["SCORE_CACHE_PATH"] = ""
+        from openai import AsyncOpenAI
+        from app.ai import scorer
+        from app.ai.cache import score_cache
+
+        scorer.client = AsyncOpenAI(base_url=f"{server.url}/v1", api_key="bench-key")
+        batch = leads(args.leads)
+
+        asyncio.run(run(fake, scorer, score_cache, batch, args))
+
+
+async def run(fake, scorer, score_cache, batch, args):
+    # One event loop for every pack size: the client's connection pool is bound to it
+    print(f"{'pack':>5} | {'requests':>8} {'prompt tok/lead':>15} {'compl tok/lead':>14} {'leads/s':>8}")
+    for pack_size in args.pack_sizes:
+        score_cache.clear()
+        fake.requests = fake.prompt_tokens = fake.completion_tokens = 0
+        start = time.perf_counter()
+        await scorer.analyze_leads(
+            batch, max_concurrency=args.concurrency, tokens_per_minute=10_000_000, pack_size=pack_size,
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"{pack_size:>5} | {fake.requests:>8} {fake.prompt_tokens / len(batch):>15.1f} "
+            f"{fake.completion_tokens / len(batch):>14.1f} {len(batch) / elapsed:>8.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Serialized leads per second for the lead response paths.
+
+"admin page": one ``/admin/leads`` page of PostgREST rows encoded the old way
+(FastAPI's ``jsonable_encoder`` + ``json.dumps`` for an untyped handler),
+through the ``LeadPage`` response model (validated and dumped to bytes by
+Pydantic's Rust core), and with orjson on the raw dicts (``ORJSONResponse``).
+
+"scored lead": building the ``leads`` row and the response body for one
+scored lead, the old way (``.dict()``, ``isoformat()`` patching and a second
+``ScoredLead(**row)``) vs one ``model_validate`` from the validated lead's
+field values + ``model_dump(mode="json")``.
+
+    python -m benchmarks.bench_serialization --page-size 200 --seconds 1
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import LeadPage, ScoredLead
+from app.routes.admin import DEFAULT_LEAD_FIELDS
+from app.routes.leads import _row, _scored
+from .bench_prescorer import synthetic_leads
+
+
+def postgrest_rows(count: int, seed: int = 3) -> list:
+    """Rows shaped like PostgREST returns them: every value JSON-native"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i, lead in enumerate(synthetic_leads(count, seed)):
+        row = lead.model_dump(mode="json")
+        row.update({
+            "id": f"{rng.getrandbits(128):032x}",
+            "created_at": (now - timedelta(seconds=i)).isoformat(),
+            "score": rng.randint(0, 100),
+            "status": rng.choice(["available", "sold"]),
+            "assigned_to": None,
+        })
+        rows.append({f: row.get(f) for f in DEFAULT_LEAD_FIELDS})
+    return rows
+
+
+def starlette_json(content) -> bytes:
+    # JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def rate(fn, items: int, seconds: float) -> float:
+    """Items per second over repeated calls of ``fn`` for about ``seconds``"""
+    fn()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return calls * items / (time.perf_counter() - start)
+
+
+def old_scored(lead, ai_result: dict) -> bytes:
+    data = lead.model_dump()
+    data["move_date"] = data["move_date"].isoformat()
+    data.update({"score": ai_result["score"], "reasoning": ai_result["reasoning"]})
+    scored = ScoredLead(**data)
+    return SCORED.dump_json(SCORED.validate_python(scored))
+
+
+def new_scored(lead, ai_result: dict) -> bytes:
+    scored = _scored(lead, ai_result)
+    _row(scored)
+    return SCORED.dump_json(SCORED.validate_python(scored))
+
+
+SCORED = TypeAdapter(ScoredLead)
+PAGE = TypeAdapter(LeadPage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--leads", type=int, default=1000, help="leads for the scored lead path")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = parser.parse_args()
+
+    rows = postgrest_rows(args.page_size)
+    page = {"leads": rows, "count": len(rows), "next_cursor": "abc"}
+    assert json.loads(starlette_json(jsonable_encoder(page))) == json.loads(
+        PAGE.dump_json(PAGE.validate_python(page), exclude_unset=True)
+    )
+
+    print(f"{'path':>34} | {'leads/s':>10} {'vs old':>7}")
+    page_paths = {
+        "admin page: jsonable_encoder+json": lambda: starlette_json(jsonable_encoder(page)),
+        "admin page: LeadPage model": lambda: PAGE.dump_json(PAGE.validate_python(page), exclude_unset=True),
+        "admin page: orjson": lambda: orjson.dumps(page),
+    }
+    leads = synthetic_leads(args.leads)
+    ai_result = {"score": 72, "reasoning": "Moderate value move with a firm date."}
+    scored_paths = {
+        "scored lead: dict+ScoredLead(**)": lambda: [old_scored(lead, ai_result) for lead in leads],
+        "scored lead: model_validate": lambda: [new_scored(lead, ai_result) for lead in leads],
+    }
+    for paths, items in ((page_paths, len(rows)), (scored_paths, len(leads))):
+        baseline = None
+        for name, fn in paths.items():
+            per_second = rate(fn, items, args.seconds)
+            baseline = baseline or per_second
+            print(f"{name:>34} | {per_second:>10,.0f} {per_second / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
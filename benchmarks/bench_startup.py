@@ -0,0 +1,81 @@
+"""
+Cold start: time to import the app and to serve the first request.
+
+Each run is a fresh interpreter, so nothing is cached in-process. "lazy" is
+the app as shipped (SDKs imported when their client is first built);
+"eager" additionally imports the openai, supabase and stripe SDKs up front,
+which is what every cold start paid before clients became lazy.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .fakes import free_port
+
+EAGER_IMPORTS = "import openai, supabase, stripe, httpx; "
+
+
+def import_time(eager: bool) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        + (EAGER_IMPORTS if eager else "")
+        + "import app.main; print(time.perf_counter() - start)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def first_response_time(eager: bool, env: dict) -> float:
+    """Seconds from spawning uvicorn until GET /metrics answers"""
+    port = free_port()
+    code = (
+        (EAGER_IMPORTS if eager else "")
+        + f"import uvicorn; uvicorn.run('app.main:app', port={port}, log_level='warning')"
+    )
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = {**os.environ, "SCORING_QUEUE_PATH": os.path.join(workdir, "queue.db")}
+
+    print(f"{'mode':>6} | {'import ms':>9} {'first response ms':>17}")
+    for eager in (True, False):
+        imports = [import_time(eager) for _ in range(args.runs)]
+        ready = [first_response_time(eager, env) for _ in range(args.runs)]
+        print(
+            f"{'eager' if eager else 'lazy':>6} | {statistics.median(imports) * 1000:>9.0f} "
+            f"{statistics.median(ready) * 1000:>17.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
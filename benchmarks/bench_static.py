@@ -0,0 +1,86 @@
+"""
+Bytes on the wire and requests/s for frontend page views.
+
+Compares the previous serving path (``FileResponse`` for pages and
+``StaticFiles`` for CSS, no compression or cache headers) with the app's
+precompressed, content-hashed assets. A "first view" fetches a page and its
+stylesheet; a "repeat view" is what a browser with a warm cache does: the
+old path re-downloads everything, the new one revalidates the page (304) and
+reuses the immutable CSS without asking.
+
+    python -m benchmarks.bench_static --views 2000
+"""
+import argparse
+import asyncio
+import re
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import FileResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+from app.main import app
+
+HEADERS = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def legacy_app() -> Starlette:
+    return Starlette(routes=[
+        Route("/", lambda request: FileResponse("frontend/index.html")),
+        Route("/admin", lambda request: FileResponse("frontend/admin.html")),
+        Mount("/static", StaticFiles(directory="frontend")),
+    ])
+
+
+async def view(client: httpx.AsyncClient, page: str, cache: dict) -> int:
+    """
+    One page view; returns body bytes received on the wire. ``cache`` plays
+    the browser cache: ETags of pages and Cache-Control of stylesheets.
+    """
+    headers = dict(HEADERS)
+    if page in cache:
+        headers["If-None-Match"] = cache[page]
+    response = await client.get(page, headers=headers)
+    received = response.num_bytes_downloaded
+    if "etag" in response.headers:
+        cache[page] = response.headers["etag"]
+    if response.status_code == 200:
+        for href in re.findall(r'href="(/static/[^"]+\.css)"', response.text):
+            if "immutable" in cache.get(href, ""):
+                continue
+            css = await client.get(href, headers=HEADERS)
+            received += css.num_bytes_downloaded
+            cache[href] = css.headers.get("cache-control", "")
+    return received
+
+
+async def measure(asgi_app, views: int) -> dict:
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = await view(client, "/admin", {})
+        warm: dict = {}
+        await view(client, "/admin", warm)
+        repeat = await view(client, "/admin", dict(warm))
+
+        start = time.perf_counter()
+        for _ in range(views):
+            await client.get("/admin", headers=HEADERS)
+        elapsed = time.perf_counter() - start
+    return {"first": first, "repeat": repeat, "rps": views / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--views", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'path':>8} | {'first view B':>12} {'repeat view B':>13} {'/admin req/s':>12}")
+    for name, asgi_app in (("legacy", legacy_app()), ("assets", app)):
+        r = asyncio.run(measure(asgi_app, args.views))
+        print(f"{name:>8} | {r['first']:>12,} {r['repeat']:>13,} {r['rps']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
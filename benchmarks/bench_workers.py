@@ -0,0 +1,121 @@
+"""
+Throughput of the API under gunicorn as the number of worker processes grows.
+
+Starts the fakes from ``benchmarks/fakes.py`` in this process, then for each
+``--workers`` count launches ``gunicorn -c gunicorn.conf.py app.main:app``
+against them and drives the same scenarios as ``bench_load``. Scaling
+efficiency is throughput relative to one worker divided by the worker count;
+it can only approach 1.0 when the machine has at least that many free cores
+(this process and its fakes need CPU too), so read it next to the core count
+printed in the header.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --requests 1000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from .bench_load import drive, scenarios, seed
+from .fakes import FakeOpenAI, FakePostgrest, FakeStripe, ServerThread, free_port
+
+ROOT = Path(__file__).parent.parent
+
+
+def start_gunicorn(workers: int, env: dict) -> tuple:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=ROOT,
+        env={**env, "WEB_CONCURRENCY": str(workers), "PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/metrics", timeout=1).status_code == 200:
+                # The first answer only proves one worker is up; give the rest a moment
+                time.sleep(0.5 * workers)
+                return process, url
+        except httpx.TransportError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("gunicorn did not come up within 60s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scenarios", nargs="+", default=["admin_leads", "analytics", "score"],
+                        choices=["score", "admin_leads", "analytics", "register"])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--db-latency", type=float, default=0.01)
+    parser.add_argument("--openai-latency", type=float, default=0.3)
+    parser.add_argument("--stripe-latency", type=float, default=0.1)
+    parser.add_argument("--seed-leads", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    db = FakePostgrest(latency=args.db_latency)
+    openai_fake = FakeOpenAI(latency=args.openai_latency)
+    stripe_fake = FakeStripe(latency=args.stripe_latency)
+    seed(db, args.seed_leads, 200)
+
+    print(f"cores: {os.cpu_count()}  concurrency: {args.concurrency}  requests/scenario: {args.requests}")
+    print(f"{'scenario':>12} {'workers':>7} | {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6} {'scaling':>8}")
+
+    with ServerThread(db.app) as db_server, \
+            ServerThread(openai_fake.app) as openai_server, \
+            ServerThread(stripe_fake.app) as stripe_server:
+        baseline = {}
+        for workers in args.workers:
+            workdir = tempfile.mkdtemp(prefix="bench-workers-")
+            env = {
+                **os.environ,
+                "SUPABASE_URL": db_server.url,
+                "SUPABASE_KEY": "bench-key",
+                "OPENAI_API_KEY": "bench-key",
+                "OPENAI_BASE_URL": f"{openai_server.url}/v1",
+                "OPENAI_TOKENS_PER_MINUTE": "100000000",
+                "OPENAI_MAX_CONCURRENCY": str(args.concurrency),
+                "STRIPE_SECRET_KEY": "sk_test_bench",
+                "STRIPE_API_BASE": stripe_server.url,
+                "SCORE_CACHE_PATH": os.path.join(workdir, "score_cache.db"),
+                "SCORING_QUEUE_PATH": os.path.join(workdir, "queue.db"),
+                "SHARED_STATE_PATH": os.path.join(workdir, "shared_state.db"),
+                "STRIPE_PRICE_CACHE_PATH": os.path.join(workdir, "prices.json"),
+                "PROMETHEUS_MULTIPROC_DIR": os.path.join(workdir, "metrics"),
+            }
+            process, url = start_gunicorn(workers, env)
+            try:
+                requests = scenarios(random.Random(42))
+                for name in args.scenarios:
+                    r = asyncio.run(drive(url, requests[name], args.requests, args.concurrency))
+                    baseline.setdefault(name, (workers, r["throughput"]))
+                    base_workers, base_throughput = baseline[name]
+                    scaling = (r["throughput"] / base_throughput) / (workers / base_workers)
+                    print(
+                        f"{name:>12} {workers:>7} | {r['throughput']:>8.1f} {r['p50_ms']:>8.1f} "
+                        f"{r['p99_ms']:>8.1f} {r['errors']:>6} {scaling:>8.2f}"
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
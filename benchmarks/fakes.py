@@ -0,0 +1,521 @@
+"""
+Local stand-ins for the external services the app talks to.
+
+These are deliberately small: just enough of each API surface for the
+benchmarks to drive the real client libraries over real HTTP, with a
+configurable injected latency so we can model a slow upstream.
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+import socket
+import threading
+import time
+import uuid
+from operator import itemgetter
+from datetime import datetime, timezone
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    """Run an ASGI app under uvicorn on a background thread"""
+
+    def __init__(self, app, port: int = None):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def _coerce(stored, raw: str):
+    """Convert a PostgREST filter operand to the type of the stored value"""
+    if isinstance(stored, bool):
+        return raw == "true"
+    if isinstance(stored, (int, float)):
+        try:
+            return type(stored)(float(raw))
+        except ValueError:
+            return raw
+    return raw
+
+
+_OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _compile(column: str, expression: str):
+    """Turn one ``column=op.value`` filter into a row predicate"""
+    op, _, raw = expression.partition(".")
+    if op == "is":
+        if raw == "null":
+            return lambda row: row.get(column) is None
+        return lambda row: str(row.get(column)).lower() == raw
+    if op == "in":
+        options = {option.strip('"') for option in raw.strip("()").split(",")}
+        return lambda row: str(row.get(column)) in options
+    compare = _OPERATORS[op]
+
+    def predicate(row):
+        value = row.get(column)
+        return value is not None and compare(value, _coerce(value, raw))
+    return predicate
+
+
+def _split_top_level(text: str) -> list:
+    """Split a PostgREST logic tree body on commas outside parens/quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _compile_tree(combinator: str, body: str):
+    """Turn ``or=(...)`` / ``and(...)`` filters into a row predicate"""
+    predicates = []
+    for term in _split_top_level(body.strip()[1:-1]):
+        if term.startswith(("and(", "or(")):
+            name, _, rest = term.partition("(")
+            predicates.append(_compile_tree(name, "(" + rest))
+        else:
+            column, _, expression = term.partition(".")
+            op, _, raw = expression.partition(".")
+            predicates.append(_compile(column, f"{op}.{raw.strip(chr(34))}"))
+    if combinator == "or":
+        return lambda row: any(p(row) for p in predicates)
+    return lambda row: all(p(row) for p in predicates)
+
+
+def admin_analytics(db: "FakePostgrest") -> dict:
+    """Python twin of supabase/migrations/*_admin_analytics.sql"""
+    by_tier: dict = {}
+    for sub in db.rows("subscriptions"):
+        if sub.get("status") == "active":
+            by_tier[sub["tier"]] = by_tier.get(sub["tier"], 0) + 1
+    leads = db.rows("leads")
+    return {
+        "total_customers": len(db.rows("customers")),
+        "active_subscriptions_by_tier": by_tier,
+        "total_leads": len(leads),
+        "available_leads": sum(1 for l in leads if l.get("status") == "available"),
+        "sold_leads": sum(1 for l in leads if l.get("status") == "sold"),
+        "overage_revenue": sum(
+            p["price_paid"] for p in db.rows("lead_purchases") if p.get("purchase_type") == "overage"
+        ),
+    }
+
+
+def assign_lead(db: "FakePostgrest", p_lead_id: str, p_customer_id: str, p_overage_prices: dict) -> dict:
+    """
+    Python twin of supabase/migrations/*_assign_lead.sql.
+
+    It runs synchronously on the fake server's event loop, so like the SQL
+    transaction it is atomic with respect to other requests.
+    """
+    sub = next(
+        (s for s in db.rows("subscriptions")
+         if s.get("customer_id") == p_customer_id and s.get("status") == "active"),
+        None,
+    )
+    if sub is None:
+        return {"success": False, "error": "no_active_subscription"}
+
+    lead = next((l for l in db.rows("leads") if l.get("id") == p_lead_id), None)
+    if lead is None or lead.get("status") != "available":
+        return {"success": False, "error": "lead_unavailable"}
+    lead.update(status="sold", assigned_to=p_customer_id)
+
+    overage = sub["leads_used"] >= sub["leads_included"]
+    purchase_type = "overage" if overage else "included"
+    price = p_overage_prices.get(sub["tier"], 0) if overage else 0
+    db.seed("lead_purchases", [{
+        "lead_id": p_lead_id, "customer_id": p_customer_id,
+        "purchase_type": purchase_type, "price_paid": price,
+    }])
+    sub["leads_used"] += 1
+    return {
+        "success": True,
+        "purchase_type": purchase_type,
+        "price": price,
+        "subscription_id": sub["id"],
+        "leads_used": sub["leads_used"],
+        "leads_included": sub["leads_included"],
+    }
+
+
+def assign_leads_bulk(db: "FakePostgrest", p_assignments: list, p_overage_prices: dict) -> list:
+    """Python twin of supabase/migrations/*_lead_routing.sql"""
+    return [
+        assign_lead(db, a["lead_id"], a["customer_id"], p_overage_prices)
+        for a in p_assignments
+    ]
+
+
+def insert_leads(db: "FakePostgrest", p_leads: list) -> list:
+    """Python twin of supabase/migrations/*_lead_dedup.sql"""
+    owners = {row["key"]: row["lead_id"] for row in db.rows("lead_dedup_keys")}
+    leads = {lead["id"]: lead for lead in db.rows("leads")}
+    results = []
+    for item in p_leads:
+        existing = next((owners[key] for key in item["keys"] if key in owners), None)
+        if existing is not None:
+            results.append({"duplicate": True, "lead": leads[existing]})
+            continue
+        lead = {"status": "available", **item["row"]}
+        db.seed("leads", [lead])
+        leads[lead["id"]] = lead
+        for key in dict.fromkeys(item["keys"]):
+            owners[key] = lead["id"]
+            db.seed("lead_dedup_keys", [{"key": key, "lead_id": lead["id"]}])
+        results.append({"duplicate": False, "lead": lead})
+    return results
+
+
+# Database functions defined in supabase/migrations, emulated in Python
+APP_FUNCTIONS = {
+    "admin_analytics": admin_analytics,
+    "assign_lead": assign_lead,
+    "assign_leads_bulk": assign_leads_bulk,
+    "insert_leads": insert_leads,
+}
+
+
+class FakePostgrest:
+    """
+    In-memory PostgREST served under ``/rest/v1`` like Supabase.
+
+    Supports select/insert/update with the filters the app uses, simple
+    ``order``/``limit``, one level of ``table(*)`` embedding and ``/rpc``
+    functions registered from Python.
+    """
+
+    RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: dict = {}
+        self.functions: dict = dict(APP_FUNCTIONS)
+        self.requests = 0
+        self.bytes_sent = 0
+        self.app = Starlette(routes=[
+            Route("/rest/v1/rpc/{fn}", self._rpc, methods=["POST", "GET"]),
+            Route("/rest/v1/{table}", self._table, methods=["GET", "POST", "PATCH", "DELETE", "HEAD"]),
+        ])
+
+    def _json(self, body, status_code: int = 200, headers: dict = None) -> Response:
+        response = JSONResponse(body, status_code=status_code, headers=headers)
+        self.bytes_sent += len(response.body)
+        return response
+
+    def seed(self, table: str, rows: list):
+        for row in rows:
+            self._prepare(row)
+        self.tables.setdefault(table, []).extend(rows)
+
+    def rows(self, table: str) -> list:
+        return self.tables.setdefault(table, [])
+
+    def _prepare(self, row: dict) -> dict:
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    def _filter(self, rows: list, params) -> list:
+        for column, expression in params.multi_items():
+            if column in self.RESERVED:
+                continue
+            if column in ("or", "and"):
+                predicate = _compile_tree(column, expression)
+            else:
+                predicate = _compile(column, expression)
+            rows = [r for r in rows if predicate(r)]
+        return rows
+
+    def _project(self, row: dict, select: str) -> dict:
+        columns = [c.strip() for c in select.split(",") if c.strip()]
+        out = {}
+        for column in columns:
+            if column == "*":
+                out.update(row)
+            elif column.endswith(")"):
+                table = column.split("(", 1)[0]
+                fk = f"{self._singular(self._table_of(row))}_id"
+                out[table] = [r for r in self.rows(table) if r.get(fk) == row.get("id")]
+            else:
+                out[column] = row.get(column)
+        return out
+
+    @staticmethod
+    def _singular(table: str) -> str:
+        return table[:-1] if table.endswith("s") else table
+
+    def _table_of(self, row: dict) -> str:
+        for name, rows in self.tables.items():
+            if any(r is row for r in rows):
+                return name
+        return ""
+
+    def _order(self, rows: list, order: str, top: int = None) -> list:
+        clauses = [clause.partition(".") for clause in order.split(",")]
+        directions = {direction.startswith("desc") for _, _, direction in clauses}
+        if len(directions) == 1:
+            # One pass on a composite key, and only the first ``top`` rows when
+            # paging; keeps the stand-in cheap next to the app under load
+            columns = [column for column, _, _ in clauses]
+            descending = directions.pop()
+
+            def key(r):
+                return tuple((r.get(c) is None, r.get(c)) for c in columns)
+
+            if all(r.get(c) is not None for r in rows for c in columns):
+                key = itemgetter(*columns)
+
+            if top is not None:
+                return (heapq.nlargest if descending else heapq.nsmallest)(top, rows, key=key)
+            return sorted(rows, key=key, reverse=descending)
+        for clause in reversed(order.split(",")):
+            column, _, direction = clause.partition(".")
+            rows = sorted(
+                rows,
+                key=lambda r: (r.get(column) is None, r.get(column)),
+                reverse=direction.startswith("desc"),
+            )
+        return rows
+
+    async def _table(self, request: Request) -> Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        table = request.path_params["table"]
+        params = request.query_params
+        rows = self.rows(table)
+
+        if request.method == "POST":
+            payload = await request.json()
+            new_rows = payload if isinstance(payload, list) else [payload]
+            for row in new_rows:
+                self._prepare(row)
+            rows.extend(new_rows)
+            return self._json(new_rows, status_code=201)
+
+        matched = self._filter(rows, params)
+        if request.method == "PATCH":
+            changes = await request.json()
+            for row in matched:
+                row.update(changes)
+            return self._json(matched)
+        if request.method == "DELETE":
+            self.tables[table] = [r for r in rows if r not in matched]
+            return self._json(matched)
+
+        total = len(matched)
+        offset = int(params.get("offset", 0))
+        if "order" in params:
+            top = offset + int(params["limit"]) if "limit" in params else None
+            matched = self._order(matched, params["order"], top)
+        if "limit" in params:
+            matched = matched[offset:offset + int(params["limit"])]
+        body = [self._project(r, params.get("select", "*")) for r in matched]
+        headers = {"Content-Range": f"0-{max(len(body) - 1, 0)}/{total}"}
+        return self._json(body, headers=headers)
+
+    async def _rpc(self, request: Request) -> Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        fn = self.functions.get(request.path_params["fn"])
+        if fn is None:
+            return self._json({"message": "function not found"}, status_code=404)
+        params = await request.json() if request.method == "POST" else dict(request.query_params)
+        result = fn(self, **params)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return self._json(result)
+
+
+class FakeStripe:
+    """
+    Minimal Stripe API (customers, subscriptions, prices, payment intents).
+
+    Point the SDK at it with ``stripe.api_base = server.url``. Every call is
+    counted per endpoint in ``calls`` so tests can assert on round-trips.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: dict = {}
+        self.objects: dict = {}
+        self.app = Starlette(routes=[
+            Route("/v1/prices", self._prices, methods=["GET", "POST"]),
+            Route("/v1/{resource}", self._create, methods=["POST"]),
+        ])
+
+    async def _record(self, request: Request) -> dict:
+        key = f"{request.method} {request.url.path}"
+        self.calls[key] = self.calls.get(key, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return dict(await request.form()) if request.method == "POST" else dict(request.query_params)
+
+    def _store(self, kind: str, prefix: str, fields: dict) -> dict:
+        obj = {"id": f"{prefix}_{uuid.uuid4().hex[:14]}", "object": kind, **fields}
+        self.objects.setdefault(kind, []).append(obj)
+        return obj
+
+    async def _prices(self, request: Request) -> Response:
+        params = await self._record(request)
+        if request.method == "POST":
+            price = self._store("price", "price", {
+                "lookup_key": params.get("lookup_key"),
+                "unit_amount": int(params.get("unit_amount", 0)),
+                "currency": params.get("currency", "usd"),
+                "active": True,
+            })
+            return JSONResponse(price)
+        wanted = {v for k, v in params.items() if k.startswith("lookup_keys")}
+        prices = [p for p in self.objects.get("price", []) if p["lookup_key"] in wanted]
+        return JSONResponse({"object": "list", "data": prices, "has_more": False, "url": "/v1/prices"})
+
+    async def _create(self, request: Request) -> Response:
+        params = await self._record(request)
+        resource = request.path_params["resource"]
+        if resource == "customers":
+            return JSONResponse(self._store("customer", "cus", {"email": params.get("email")}))
+        if resource == "subscriptions":
+            price = params.get("items[0][price]")
+            if not any(p["id"] == price for p in self.objects.get("price", [])):
+                return JSONResponse({"error": {
+                    "type": "invalid_request_error", "code": "resource_missing",
+                    "param": "items[0][price]", "message": f"No such price: '{price}'",
+                }}, status_code=400)
+            return JSONResponse(self._store("subscription", "sub", {
+                "status": "active",
+                "customer": params.get("customer"),
+                "price": params.get("items[0][price]"),
+            }))
+        if resource == "payment_intents":
+            return JSONResponse(self._store("payment_intent", "pi", {
+                "amount": int(params.get("amount", 0)),
+                "customer": params.get("customer"),
+                "status": "requires_payment_method",
+            }))
+        return JSONResponse({"error": {"message": f"Unknown resource {resource}"}}, status_code=404)
+
+
+def approx_tokens(text: str) -> int:
+    """~4 characters per token, close enough to compare prompt shapes"""
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAI:
+    """
+    Chat completions endpoint that scores leads deterministically.
+
+    A request with a system message and a JSON array as the user message is
+    treated as a packed request and answered with ``{"results": [...]}``;
+    anything else gets a single ``{"score", "reasoning"}`` object. Response
+    time is ``latency`` plus ``token_latency`` per generated token, roughly
+    how a real model behaves. Ids in ``omit_ids`` are left out of packed
+    replies to exercise the fallback path.
+    """
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.omit_ids: set = set()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.app = Starlette(routes=[Route("/v1/chat/completions", self._complete, methods=["POST"])])
+
+    @staticmethod
+    def _score(text: str) -> int:
+        return 26 + int(hashlib.sha256(text.encode()).hexdigest(), 16) % 59
+
+    def _reply(self, messages: list) -> str:
+        roles = {m["role"]: m["content"] for m in messages}
+        if "system" in roles:
+            try:
+                leads = json.loads(roles.get("user", ""))
+            except ValueError:
+                leads = None
+            if isinstance(leads, list):
+                return json.dumps({"results": [
+                    {"id": lead["id"], "score": self._score(json.dumps(lead, sort_keys=True)),
+                     "reasoning": f"{lead.get('size')} move, urgency {lead.get('urgency')}."}
+                    for lead in leads if lead.get("id") not in self.omit_ids
+                ]})
+        prompt = messages[-1]["content"]
+        return json.dumps({
+            "score": self._score(prompt),
+            "reasoning": "Moderate value move with reasonable urgency; follow up within a day.",
+        })
+
+    async def _complete(self, request: Request) -> Response:
+        body = await request.json()
+        content = self._reply(body["messages"])
+        prompt_tokens = sum(approx_tokens(m["content"]) + 4 for m in body["messages"])
+        completion_tokens = approx_tokens(content)
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+        delay = self.latency + self.token_latency * completion_tokens
+        if delay:
+            await asyncio.sleep(delay)
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
@@ -0,0 +1,41 @@
+"""
+Production server: ``gunicorn -c gunicorn.conf.py app.main:app``
+
+Runs WEB_CONCURRENCY uvicorn workers (default: 2). State that
+must agree across workers lives in SQLite files next to the app (score
+cache, scoring journal, analytics generations); per-process budgets such as
+the OpenAI rate limit are divided between workers (see ``app/shared.py``).
+"""
+import os
+import shutil
+
+# Not os.cpu_count(): in a container that is the host's cores, and every
+# worker brings its own DB_MAX_WORKERS threads, scoring workers and share of
+# the OpenAI budget. Set WEB_CONCURRENCY to what the instance can carry.
+workers = int(os.getenv("WEB_CONCURRENCY") or 2)
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# Leave time for in-flight OpenAI calls (OPENAI_DEADLINE) on shutdown/reload
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+accesslog = "-"
+
+# Read by the workers at import time
+os.environ["WEB_CONCURRENCY"] = str(workers)
+if workers > 1:
+    os.environ.setdefault("SCORE_CACHE_PATH", "score_cache.db")
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/movescout-metrics")
+
+def on_starting(server):
+    # Samples from a previous run would be summed into this one
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,6 @@
+-- Leads accepted through /leads/ingest are stored before they are scored.
+alter table leads alter column score drop not null;
+alter table leads alter column reasoning drop not null;
+
+-- Background workers and the status endpoint look leads up by status.
+create index if not exists leads_status_idx on leads (status);
@@ -0,0 +1,31 @@
+-- Dashboard counts and sums computed in the database so /admin/analytics
+-- transfers one small JSON object instead of whole tables.
+-- MRR is derived in the app from the per-tier counts and PRICING_TIERS.
+create or replace function admin_analytics()
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'total_customers', (select count(*) from customers),
+    'active_subscriptions_by_tier', coalesce(
+      (select json_object_agg(tier, n)
+         from (select tier, count(*) as n
+                 from subscriptions
+                where status = 'active'
+                group by tier) t),
+      '{}'::json
+    ),
+    'total_leads', (select count(*) from leads),
+    'available_leads', (select count(*) from leads where status = 'available'),
+    'sold_leads', (select count(*) from leads where status = 'sold'),
+    'overage_revenue', (
+      select coalesce(sum(price_paid), 0)
+        from lead_purchases
+       where purchase_type = 'overage'
+    )
+  );
+$$;
+
+create index if not exists subscriptions_status_tier_idx on subscriptions (status, tier);
+create index if not exists lead_purchases_type_idx on lead_purchases (purchase_type) include (price_paid);
@@ -0,0 +1,10 @@
+-- Keyset pagination for /admin/leads walks (created_at, id) newest-first.
+create index if not exists leads_created_id_idx
+  on leads (created_at desc, id desc);
+
+-- Same order within a status filter (the dashboard's most common view).
+create index if not exists leads_status_created_id_idx
+  on leads (status, created_at desc, id desc);
+
+-- min_score filter.
+create index if not exists leads_score_idx on leads (score);
@@ -0,0 +1,3 @@
+-- Streaming exports page through lead_purchases by (purchased_at, id).
+create index if not exists lead_purchases_purchased_id_idx
+  on lead_purchases (purchased_at desc, id desc);
@@ -0,0 +1,71 @@
+-- Assign a lead to a customer in one transaction and one round-trip.
+--
+-- The active subscription row is locked (FOR UPDATE) so concurrent
+-- assignments for the same customer serialize and leads_used is incremented
+-- in place, never read-modify-written by the app. The lead is claimed with a
+-- conditional update on status = 'available', so it can only be sold once.
+-- Overage prices are passed in from PRICING_TIERS ({"starter": 12, ...}).
+create or replace function assign_lead(
+  p_lead_id uuid,
+  p_customer_id uuid,
+  p_overage_prices jsonb
+)
+returns json
+language plpgsql
+as $$
+declare
+  v_sub subscriptions%rowtype;
+  v_type text;
+  v_price numeric;
+  v_leads_used integer;
+begin
+  select * into v_sub
+    from subscriptions
+   where customer_id = p_customer_id
+     and status = 'active'
+   order by created_at desc
+   limit 1
+   for update;
+
+  if not found then
+    return json_build_object('success', false, 'error', 'no_active_subscription');
+  end if;
+
+  update leads
+     set status = 'sold', assigned_to = p_customer_id
+   where id = p_lead_id
+     and status = 'available';
+
+  if not found then
+    return json_build_object('success', false, 'error', 'lead_unavailable');
+  end if;
+
+  if v_sub.leads_used >= v_sub.leads_included then
+    v_type := 'overage';
+    v_price := coalesce((p_overage_prices ->> v_sub.tier)::numeric, 0);
+  else
+    v_type := 'included';
+    v_price := 0;
+  end if;
+
+  insert into lead_purchases (lead_id, customer_id, purchase_type, price_paid)
+  values (p_lead_id, p_customer_id, v_type, v_price);
+
+  update subscriptions
+     set leads_used = leads_used + 1
+   where id = v_sub.id
+  returning leads_used into v_leads_used;
+
+  return json_build_object(
+    'success', true,
+    'purchase_type', v_type,
+    'price', v_price,
+    'subscription_id', v_sub.id,
+    'leads_used', v_leads_used,
+    'leads_included', v_sub.leads_included
+  );
+end;
+$$;
+
+-- Last line of defence against selling a lead twice.
+create unique index if not exists lead_purchases_lead_id_key on lead_purchases (lead_id);
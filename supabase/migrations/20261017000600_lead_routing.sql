@@ -0,0 +1,48 @@
+-- Service areas for automatic routing: 3-digit zip prefixes a customer
+-- serves. An empty/null list means the customer accepts leads nationwide.
+alter table customers
+  add column if not exists service_zip_prefixes text[] not null default '{}';
+
+-- Commit a whole routing run in one transaction and one round-trip.
+-- p_assignments is a JSON array of {"lead_id", "customer_id"} objects; each
+-- goes through assign_lead(), so locking, availability checks and usage
+-- accounting are identical to manual assignment. Returns one result per
+-- assignment, in order.
+create or replace function assign_leads_bulk(
+  p_assignments jsonb,
+  p_overage_prices jsonb
+)
+returns json
+language plpgsql
+as $$
+declare
+  v_item jsonb;
+  v_results json[] := '{}';
+begin
+  -- Lock subscriptions in a stable order so concurrent runs can't deadlock
+  perform 1
+     from subscriptions
+    where status = 'active'
+      and customer_id in (
+        select distinct (a ->> 'customer_id')::uuid
+          from jsonb_array_elements(p_assignments) a
+      )
+    order by id
+      for update;
+
+  for v_item in select * from jsonb_array_elements(p_assignments)
+  loop
+    v_results := v_results || assign_lead(
+      (v_item ->> 'lead_id')::uuid,
+      (v_item ->> 'customer_id')::uuid,
+      p_overage_prices
+    );
+  end loop;
+
+  return array_to_json(v_results);
+end;
+$$;
+
+-- Routing scans available leads best-first.
+create index if not exists leads_available_score_idx
+  on leads (score desc) where status = 'available';
@@ -0,0 +1,89 @@
+-- Duplicate detection at ingest.
+--
+-- Every lead is indexed under several identity keys computed by
+-- app/services/dedup.py: its normalized email, its normalized phone and
+-- (name, move date, origin zip, destination zip). Keys are sha256 digests so
+-- this table holds no contact details. The primary key is the unique index
+-- that makes "one lead per person" hold across workers and instances.
+create table if not exists lead_dedup_keys (
+  key text primary key,
+  lead_id uuid not null references leads (id) on delete cascade
+);
+
+create index if not exists lead_dedup_keys_lead_id_idx on lead_dedup_keys (lead_id);
+
+-- Insert leads unless one of their keys is already taken, in one round-trip.
+-- p_leads is a JSON array of {"row": {...leads columns}, "keys": [...]}.
+-- Returns one {"duplicate": bool, "lead": {...}} per input, in order; for a
+-- duplicate "lead" is the row that already owns the key. A concurrent
+-- insert of the same person blocks on the primary key and then lands in
+-- the unique_violation handler, so only one of them is ever stored.
+create or replace function insert_leads(p_leads jsonb)
+returns json
+language plpgsql
+as $$
+declare
+  v_item jsonb;
+  v_lead leads%rowtype;
+  v_results json[] := '{}';
+begin
+  for v_item in select * from jsonb_array_elements(p_leads)
+  loop
+    select l.* into v_lead
+      from lead_dedup_keys d
+      join leads l on l.id = d.lead_id
+     where d.key in (select jsonb_array_elements_text(v_item -> 'keys'))
+     limit 1;
+
+    if found then
+      v_results := v_results || json_build_object('duplicate', true, 'lead', row_to_json(v_lead));
+      continue;
+    end if;
+
+    begin
+      insert into leads
+      select * from jsonb_populate_record(
+        null::leads,
+        jsonb_build_object('id', gen_random_uuid(), 'status', 'available', 'created_at', now())
+          || (v_item -> 'row')
+      )
+      returning * into v_lead;
+
+      insert into lead_dedup_keys (key, lead_id)
+      select distinct k, v_lead.id from jsonb_array_elements_text(v_item -> 'keys') k;
+
+      v_results := v_results || json_build_object('duplicate', false, 'lead', row_to_json(v_lead));
+    exception when unique_violation then
+      select l.* into v_lead
+        from lead_dedup_keys d
+        join leads l on l.id = d.lead_id
+       where d.key in (select jsonb_array_elements_text(v_item -> 'keys'))
+       limit 1;
+      v_results := v_results || json_build_object('duplicate', true, 'lead', row_to_json(v_lead));
+    end;
+  end loop;
+
+  return array_to_json(v_results);
+end;
+$$;
+
+-- Index the leads stored before this migration, oldest first so the
+-- original submission owns its keys. Same normalization as dedup_keys().
+insert into lead_dedup_keys (key, lead_id)
+select k.key, k.lead_id
+  from (
+    select id as lead_id, created_at, unnest(array[
+      case when nullif(trim(email), '') is not null
+        then 'email:' || encode(sha256(convert_to(lower(trim(email)), 'UTF8')), 'hex') end,
+      case when length(regexp_replace(regexp_replace(phone, '\D', '', 'g'), '^1(\d{10})$', '\1')) >= 7
+        then 'phone:' || encode(sha256(convert_to(
+          regexp_replace(regexp_replace(phone, '\D', '', 'g'), '^1(\d{10})$', '\1'), 'UTF8')), 'hex') end,
+      'person:' || encode(sha256(convert_to(
+        regexp_replace(lower(trim(full_name)), '\s+', ' ', 'g') || '|' || move_date::text || '|'
+          || trim(origin_zip) || '|' || trim(destination_zip), 'UTF8')), 'hex')
+    ]) as key
+      from leads
+  ) k
+ where k.key is not null
+ order by k.created_at
+    on conflict (key) do nothing;
@@ -0,0 +1,10 @@
+-- Overage already charged per subscription and billing period.
+--
+-- run_overage_billing charges only leads_used - leads_included beyond
+-- overage_billed and raises overage_billed after each successful charge,
+-- so re-running the job (even days later, after Stripe has forgotten the
+-- idempotency key) never charges the same leads twice. overage_period is
+-- the period overage_billed belongs to; a new period starts again from 0.
+alter table subscriptions
+  add column if not exists overage_billed integer not null default 0,
+  add column if not exists overage_period text;
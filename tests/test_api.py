@@ -1,17 +1,29 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch
 from app.main import app
+from app.services.analytics import analytics_snapshot
+from app.services.dedup import lead_index
 
 client = TestClient(app)
 
+def insert_leads_rpc(fn, params):
+    query = MagicMock()
+    query.execute.return_value.data = [
+        {"duplicate": False, "lead": {"id": f"lead-{i}", **item["row"]}}
+        for i, item in enumerate(params["p_leads"])
+    ]
+    return query
+
 @pytest.fixture
 def mock_dependencies():
-    with patch("app.routes.leads.supabase") as mock_supabase, \
+    with patch("app.services.dedup.supabase") as mock_supabase, \
          patch("app.ai.scorer.client") as mock_openai:
         
-        # Mock Supabase
-        mock_supabase.table.return_value.insert.return_value.execute.return_value = None
+        # Mock Supabase: insert_leads stores every lead as new
+        mock_supabase.rpc.side_effect = insert_leads_rpc
+        lead_index.clear()
         
         # Mock OpenAI
         mock_completion = MagicMock()
@@ -58,3 +70,111 @@ def test_score_lead_endpoint(mock_dependencies):
         assert data["full_name"] == "John Doe"
         assert data["score"] == 90
         assert data["reasoning"] == "Mocked AI"
+
+def test_score_leads_batch_endpoint(mock_dependencies):
+    mock_supabase, _ = mock_dependencies
+    lead = {
+        "full_name": "Jane Roe",
+        "email": "jane@example.com",
+        "phone": "555-9876",
+        "move_date": "2030-05-01",
+        "origin_zip": "10001",
+        "destination_zip": "30301",
+        "home_size": "3BR",
+        "budget": "7000",
+        "urgency": "Medium"
+    }
+
+    with patch("app.routes.leads.analyze_leads") as mock_analyze:
+        mock_analyze.return_value = [
+            {"score": 75, "reasoning": "Solid lead"},
+            RuntimeError("OpenAI timeout"),
+        ]
+
+        response = client.post("/leads/score/batch", json={"leads": [lead, lead]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["score"] for r in data["results"]] == [75]
+        assert data["failures"] == [{"index": 1, "email": "jane@example.com", "error": "OpenAI timeout"}]
+        assert data["persisted"] is True
+        # One bulk insert for the whole batch
+        fn, params = mock_supabase.rpc.call_args.args
+        assert fn == "insert_leads" and len(params["p_leads"]) == 1
+
+def test_batch_limits_cannot_exceed_the_server_limits():
+    lead = {
+        "full_name": "Jane Roe", "email": "jane@example.com", "phone": "555-9876",
+        "move_date": "2030-05-01", "origin_zip": "10001", "destination_zip": "30301",
+        "home_size": "3BR", "budget": "7000", "urgency": "Medium",
+    }
+    for limits in ({"max_concurrency": -1}, {"max_concurrency": 10_000}, {"tokens_per_minute": 0}):
+        response = client.post("/leads/score/batch", json={"leads": [lead], **limits})
+        assert response.status_code == 422
+
+def test_analytics_uses_single_aggregate_call():
+    stats = {
+        "total_customers": 3,
+        "active_subscriptions_by_tier": {"starter": 2, "enterprise": 1},
+        "total_leads": 10,
+        "available_leads": 6,
+        "sold_leads": 4,
+        "overage_revenue": 24,
+    }
+    analytics_snapshot.invalidate()
+    with patch("app.services.analytics.supabase") as mock_supabase:
+        mock_supabase.rpc.return_value.execute.return_value = MagicMock(data=stats)
+        response = client.get("/admin/analytics", auth=("admin", "changeme"))
+        # Repeat polls revalidate against the in-memory snapshot
+        etag = response.headers["etag"]
+        cached = client.get("/admin/analytics", auth=("admin", "changeme"), headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_customers": 3,
+        "active_subscriptions": 3,
+        "monthly_recurring_revenue": 299 * 2 + 999,
+        "total_leads": 10,
+        "available_leads": 6,
+        "sold_leads": 4,
+        "overage_revenue": 24,
+        "total_revenue": 299 * 2 + 999 + 24,
+    }
+    mock_supabase.rpc.assert_called_once_with("admin_analytics", {})
+    mock_supabase.table.assert_not_called()
+
+def test_analytics_snapshot_tracks_writes():
+    analytics_snapshot._set({
+        "total_customers": 1, "active_subscriptions": 1, "monthly_recurring_revenue": 299,
+        "total_leads": 5, "available_leads": 5, "sold_leads": 0,
+        "overage_revenue": 0, "total_revenue": 299,
+    })
+    analytics_snapshot._loaded_at = float("inf")
+    _, before = asyncio.run(analytics_snapshot.get())
+
+    analytics_snapshot.lead_added()
+    analytics_snapshot.lead_sold(price=12)
+    analytics_snapshot.customer_registered("professional", "active")
+    data, after = asyncio.run(analytics_snapshot.get())
+
+    assert after != before
+    assert data["total_leads"] == 6
+    assert data["available_leads"] == 5
+    assert data["sold_leads"] == 1
+    assert data["overage_revenue"] == 12
+    assert data["total_customers"] == 2
+    assert data["monthly_recurring_revenue"] == 299 + 599
+    assert data["total_revenue"] == 299 + 599 + 12
+    analytics_snapshot.invalidate()
+
+def test_admin_responses_are_typed_in_openapi():
+    paths = client.get("/openapi.json").json()["paths"]
+
+    def schema(path, method="get"):
+        return paths[path][method]["responses"]["200"]["content"]["application/json"]["schema"]["$ref"]
+
+    assert schema("/admin/leads").endswith("/LeadPage")
+    assert schema("/admin/customers").endswith("/CustomerList")
+    assert schema("/admin/leads/{lead_id}/assign", "post").endswith("/AssignResult")
+    assert schema("/admin/leads/route", "post").endswith("/RouteResult")
@@ -0,0 +1,44 @@
+import re
+from fastapi.testclient import TestClient
+from app.assets import negotiate
+from app.main import app
+
+client = TestClient(app)
+
+def test_pages_reference_content_hashed_css():
+    html = client.get("/", headers={"Accept-Encoding": "identity"}).text
+    href = re.search(r'href="(/static/style\.[0-9a-f]{12}\.css)"', html).group(1)
+
+    response = client.get(href, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert b"{" in response.content  # httpx already decoded the gzip body
+
+def test_page_revalidates_with_strong_etag():
+    first = client.get("/admin", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["cache-control"] == "no-cache"
+    etag = first.headers["etag"]
+    assert not etag.startswith("W/")
+
+    again = client.get("/admin", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    # A different representation has its own validator
+    plain = client.get("/admin", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert plain.status_code == 200 and plain.headers["etag"] != etag
+
+def test_negotiate_prefers_brotli_and_honours_q_values():
+    both = {"identity", "gzip", "br"}
+    assert negotiate("gzip, deflate, br", both) == "br"
+    assert negotiate("gzip, br;q=0", both) == "gzip"
+    assert negotiate("br", {"identity", "gzip"}) == "identity"
+    assert negotiate("*", both) == "br"
+    assert negotiate("", both) == "identity"
+
+def test_json_responses_are_gzipped():
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["paths"]
+
+def test_unknown_static_file_is_404():
+    assert client.get("/static/missing.css").status_code == 404
@@ -0,0 +1,29 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from supabase import create_client
+from app.services.billing import run_overage_billing
+from benchmarks.fakes import FakePostgrest, ServerThread
+
+def test_overage_is_charged_once_per_lead():
+    fake = FakePostgrest()
+    fake.seed("customers", [{"id": "11111111-1111-1111-1111-111111111111", "stripe_customer_id": "cus_1"}])
+    fake.seed("subscriptions", [{
+        "customer_id": "11111111-1111-1111-1111-111111111111", "tier": "starter", "status": "active",
+        "leads_included": 5, "leads_used": 8, "current_period_start": None,
+        "overage_billed": 0, "overage_period": None,
+    }])
+    charge = AsyncMock(side_effect=lambda charges: [{"success": True, "amount": 1} for _ in charges])
+    with ServerThread(fake.app) as server, \
+            patch("app.services.billing.supabase", create_client(server.url, "test-key")), \
+            patch("app.services.billing.charge_overages", charge):
+        first = asyncio.run(run_overage_billing())
+        again = asyncio.run(run_overage_billing())
+        fake.rows("subscriptions")[0]["leads_used"] = 10
+        more = asyncio.run(run_overage_billing())
+
+    assert [r["num_leads"] for r in first["results"]] == [3]
+    assert again["results"] == []
+    assert [r["num_leads"] for r in more["results"]] == [2]
+    keys = [call.args[0][0]["idempotency_key"] for call in charge.await_args_list if call.args[0]]
+    assert len(set(keys)) == 2
+    assert fake.rows("subscriptions")[0]["overage_billed"] == 5
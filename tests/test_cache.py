@@ -0,0 +1,74 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.models import RawLead
+from app.ai.cache import ScoreCache, cache_key, score_cache
+from app.ai.scorer import analyze_lead
+
+def make_lead(**overrides):
+    data = {
+        "full_name": "John Doe",
+        "email": "john@example.com",
+        "phone": "555-1234",
+        "move_date": "2030-10-01",
+        "origin_zip": "10001",
+        "destination_zip": "90210",
+        "home_size": "2BR",
+        "budget": "5000",
+        "urgency": "High",
+    }
+    data.update(overrides)
+    return RawLead(**data)
+
+def test_cache_key_ignores_contact_fields_and_normalizes():
+    a = make_lead()
+    b = make_lead(full_name="Someone Else", email="x@y.com", urgency="  high ")
+    assert cache_key(a) == cache_key(b)
+    assert cache_key(a) != cache_key(make_lead(budget="6000"))
+
+def test_lru_eviction_and_ttl():
+    cache = ScoreCache(max_size=2, ttl=0.05)
+    cache.set("a", {"score": 1})
+    cache.set("b", {"score": 2})
+    cache.get("a")
+    cache.set("c", {"score": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"score": 1}
+    assert cache.stats()["evictions"] == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+def test_persistent_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "scores.db")
+    ScoreCache(path=path).set("k", {"score": 70, "reasoning": "cached"})
+    fresh = ScoreCache(path=path)
+    assert fresh.get("k") == {"score": 70, "reasoning": "cached"}
+    assert fresh.stats()["disk_hits"] == 1
+
+def test_analyze_lead_reuses_cached_score():
+    score_cache.clear()
+    completion = MagicMock()
+    completion.choices[0].message.content = '{"score": 88, "reasoning": "Test reasoning"}'
+    with patch("app.ai.scorer.client") as mock_openai:
+        mock_openai.chat.completions.create = AsyncMock(return_value=completion)
+        first = asyncio.run(analyze_lead(make_lead()))
+        second = asyncio.run(analyze_lead(make_lead(email="dup@example.com")))
+    assert first == second == {"score": 88, "reasoning": "Test reasoning"}
+    assert mock_openai.chat.completions.create.await_count == 1
+    score_cache.clear()
+
+def test_malformed_replies_are_normalized_or_never_cached():
+    score_cache.clear()
+    completion = MagicMock()
+    with patch("app.ai.scorer.client") as mock_openai:
+        mock_openai.chat.completions.create = AsyncMock(return_value=completion)
+        for content in ('{"score": "high", "reasoning": "x"}', '{"reasoning": "no score"}', '{"score": 72}'):
+            completion.choices[0].message.content = content
+            result = asyncio.run(analyze_lead(make_lead()))
+            assert "rule-based estimate" in result["reasoning"]
+            assert score_cache.stats()["size"] == 0
+
+        completion.choices[0].message.content = '{"score": 72.5, "reasoning": "fractional"}'
+        assert asyncio.run(analyze_lead(make_lead())) == {"score": 72, "reasoning": "fractional"}
+        assert asyncio.run(analyze_lead(make_lead(email="dup@example.com")))["score"] == 72
+    score_cache.clear()
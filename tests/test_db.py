@@ -0,0 +1,18 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+from app.db import execute
+
+def test_execute_runs_off_event_loop_thread():
+    loop_thread = threading.get_ident()
+    seen = {}
+
+    def fake_execute():
+        seen["thread"] = threading.get_ident()
+        return "result"
+
+    query = MagicMock()
+    query.execute = fake_execute
+
+    assert asyncio.run(execute(query)) == "result"
+    assert seen["thread"] != loop_thread
@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock, patch
+import pytest
+from fastapi.testclient import TestClient
+from supabase import create_client
+from app.main import app
+from app.models import RawLead
+from app.services.dedup import dedup_keys, lead_index
+from benchmarks.fakes import FakePostgrest, ServerThread
+
+LEAD = {
+    "full_name": "John Doe",
+    "email": "john@example.com",
+    "phone": "555-123-4567",
+    "move_date": "2030-10-01",
+    "origin_zip": "10001",
+    "destination_zip": "90210",
+    "home_size": "2BR",
+    "budget": "5000",
+    "urgency": "High",
+}
+
+@pytest.fixture
+def fake_db():
+    fake = FakePostgrest()
+    with ServerThread(fake.app) as server:
+        with patch("app.services.dedup.supabase", create_client(server.url, "test-key")):
+            lead_index.clear()
+            yield fake
+
+def test_keys_normalize_contact_details():
+    keys = set(dedup_keys(RawLead(**LEAD)))
+    same_email = dedup_keys(RawLead(**{**LEAD, "email": " John@Example.COM ", "phone": "", "full_name": "X"}))
+    same_phone = dedup_keys(RawLead(**{**LEAD, "email": "other@example.com", "phone": "+1 (555) 123-4567"}))
+    same_person = dedup_keys(RawLead(**{**LEAD, "email": "", "phone": "n/a", "full_name": " john  DOE "}))
+    stranger = dedup_keys(RawLead(**{**LEAD, "email": "jane@example.com", "phone": "555-000-0000", "full_name": "Jane"}))
+
+    assert keys & set(same_email) and keys & set(same_phone) and keys & set(same_person)
+    assert not keys & set(stranger)
+    # Too few digits to identify anyone
+    assert len(same_person) == 1
+
+def test_duplicate_returns_existing_lead_without_rescoring(fake_db):
+    analyze = AsyncMock(return_value={"score": 80, "reasoning": "ok"})
+    client = TestClient(app)
+    with patch("app.routes.leads.analyze_lead", analyze):
+        first = client.post("/leads/score", json=LEAD).json()
+        again = client.post("/leads/score", json={**LEAD, "email": "JOHN@example.com"}).json()
+        # Another worker (or a restart) has an empty in-memory index; the DB
+        # lookup still catches it before OpenAI is called
+        lead_index.clear()
+        elsewhere = client.post("/leads/score", json={**LEAD, "phone": "15551234567"}).json()
+
+    assert first["duplicate"] is False and first["id"]
+    assert again["duplicate"] is True and again["score"] == first["score"]
+    assert elsewhere["duplicate"] is True and elsewhere["score"] == first["score"]
+    assert analyze.await_count == 1
+    assert len(fake_db.rows("leads")) == 1
+
+def test_batch_stores_repeated_person_once(fake_db):
+    analyze = AsyncMock(return_value=[{"score": 70, "reasoning": "ok"}] * 2)
+    with patch("app.routes.leads.analyze_leads", analyze):
+        response = TestClient(app).post("/leads/score/batch", json={"leads": [LEAD, {**LEAD, "budget": "9000"}]})
+
+    results = response.json()["results"]
+    assert [r["duplicate"] for r in results] == [False, True]
+    assert results[0]["id"] and results[1]["id"] is None
+    assert len(fake_db.rows("leads")) == 1
+
+def test_duplicate_never_discloses_the_stored_lead(fake_db):
+    analyze = AsyncMock(return_value={"score": 80, "reasoning": "Moves John Doe from 10001"})
+    client = TestClient(app)
+    probe = {**LEAD, "full_name": "Someone Else", "phone": "000", "origin_zip": "00000",
+             "destination_zip": "00000", "move_date": "2031-01-01"}
+    with patch("app.routes.leads.analyze_lead", analyze), \
+         patch("app.routes.leads.analyze_leads", AsyncMock(return_value=[{"score": 80, "reasoning": "ok"}])):
+        stored = client.post("/leads/score", json=LEAD).json()
+        single = client.post("/leads/score", json=probe).json()
+        lead_index.clear()
+        batch = client.post("/leads/score/batch", json={"leads": [probe]}).json()["results"][0]
+        lead_index.clear()
+        raced = client.post("/leads/score", json=probe).json()
+
+    # Raced past the lookup: the insert RPC reports the duplicate
+    with patch("app.routes.leads.find_duplicates", AsyncMock(return_value={})):
+        ingested = client.post("/leads/ingest", json=probe).json()
+    assert ingested["duplicate"] is True and ingested["id"] is None
+
+    for response in (single, batch, raced):
+        assert response["duplicate"] is True and response["id"] is None
+        assert response["score"] == stored["score"]
+        assert "John" not in response["reasoning"]
+        for field in ("full_name", "phone", "origin_zip", "destination_zip", "move_date"):
+            assert response[field] == probe[field]
@@ -0,0 +1,69 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+from supabase import create_client
+from app.main import app
+from app.services.export import _encode_csv
+from benchmarks.fakes import FakePostgrest, ServerThread
+
+AUTH = ("admin", "changeme")
+
+@pytest.fixture(scope="module")
+def fake_db():
+    fake = FakePostgrest()
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    fake.seed("leads", [
+        {"full_name": f"Lead {i}", "email": f"lead{i}@example.com", "score": i,
+         "status": "available", "created_at": (start + timedelta(minutes=i)).isoformat()}
+        for i in range(25)
+    ])
+    fake.seed("lead_purchases", [
+        {"lead_id": f"lead-{i}", "customer_id": "c1", "purchase_type": "overage",
+         "price_paid": 12, "purchased_at": (start + timedelta(minutes=i)).isoformat()}
+        for i in range(5)
+    ])
+    with ServerThread(fake.app) as server, \
+         patch("app.services.export.supabase", create_client(server.url, "test-key")), \
+         patch("app.services.export.EXPORT_PAGE_SIZE", 10):
+        yield fake
+
+def test_export_leads_csv_pages_through_table(fake_db):
+    requests_before = fake_db.requests
+    response = TestClient(app).get(
+        "/admin/export/leads", params={"fields": "full_name,score"}, auth=AUTH
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 25
+    assert rows[0]["full_name"] == "Lead 24"
+    assert set(rows[0]) == {"id", "created_at", "full_name", "score"}
+    assert fake_db.requests - requests_before == 3
+
+def test_export_purchases_ndjson_gzip(fake_db):
+    response = TestClient(app).get(
+        "/admin/export/purchases", params={"format": "ndjson", "gzip": "true"}, auth=AUTH
+    )
+    assert response.status_code == 200
+    assert 'purchases.ndjson.gz' in response.headers["content-disposition"]
+
+    lines = gzip.decompress(response.content).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 5
+    assert records[0]["price_paid"] == 12
+
+def test_export_rejects_unknown_format(fake_db):
+    response = TestClient(app).get("/admin/export/leads", params={"format": "xml"}, auth=AUTH)
+    assert response.status_code == 400
+
+def test_csv_cells_never_start_a_formula():
+    rows = [{"full_name": "=HYPERLINK(\"http://x\")", "email": "@SUM(A1)", "phone": "+1 555", "score": -3}]
+    out = _encode_csv(rows, ["full_name", "email", "phone", "score"], header=False).decode()
+    row = next(csv.reader(io.StringIO(out)))
+    assert row == ["'=HYPERLINK(\"http://x\")", "'@SUM(A1)", "'+1 555", "-3"]
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from app.ai.limiter import RateLimiter
+
+def test_limiter_caps_concurrency():
+    limiter = RateLimiter(max_concurrency=2, tokens_per_minute=1_000_000)
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        async with limiter.limit(10):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak == 2
+
+def test_limiter_waits_for_token_budget():
+    # 600 tokens/minute refills 10 tokens per second
+    limiter = RateLimiter(max_concurrency=10, tokens_per_minute=600)
+
+    async def main():
+        async with limiter.limit(600):
+            pass
+        start = time.monotonic()
+        async with limiter.limit(2):
+            pass
+        return time.monotonic() - start
+
+    assert 0.15 <= asyncio.run(main()) < 1.0
+
+def test_try_acquire_never_waits():
+    limiter = RateLimiter(max_concurrency=1, tokens_per_minute=600)
+
+    async def main():
+        await limiter.acquire(10)
+        assert not await limiter.try_acquire(10)    # no free slot
+        limiter.release()
+        assert not await limiter.try_acquire(600)   # slot free, budget spent
+        assert await limiter.try_acquire(10)
+        limiter.release()
+
+    asyncio.run(main())
+
+def test_child_limiter_stays_inside_its_parent():
+    parent = RateLimiter(max_concurrency=2, tokens_per_minute=1_000_000)
+    child = RateLimiter(max_concurrency=5, tokens_per_minute=1_000_000, parent=parent)
+    active = 0
+    peak = 0
+
+    async def work(limiter):
+        nonlocal active, peak
+        async with limiter.limit(10):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(work(child) for _ in range(5)), *(work(parent) for _ in range(5)))
+        assert await child.try_acquire(10)
+        assert await child.try_acquire(10)
+        # Both parent slots are held through the child
+        assert not await parent.try_acquire(10)
+        assert not await child.try_acquire(10)
+
+    asyncio.run(main())
+    assert peak == 2
@@ -0,0 +1,36 @@
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from supabase import create_client
+from app.main import app
+from app.services.analytics import analytics_snapshot
+from benchmarks.fakes import FakePostgrest, ServerThread
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of one sample in Prometheus text output (0 if not exported yet); labels in declared order"""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    prefix = f"{name}{{{wanted}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.split()[-1])
+    return 0.0
+
+def test_metrics_record_route_latency_stages_and_db_calls():
+    fake = FakePostgrest()
+    analytics_snapshot.invalidate()
+    with ServerThread(fake.app) as server, \
+            patch("app.services.analytics.supabase", create_client(server.url, "test-key")), \
+            TestClient(app) as client:
+        before = client.get("/metrics").text
+        assert client.get("/admin/analytics", auth=("admin", "changeme")).status_code == 200
+        after = client.get("/metrics").text
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    route = {"route": "/admin/analytics"}
+    assert delta("http_request_duration_seconds_count", method="GET", **route, status="200") == 1
+    # The snapshot was cold, so this request made exactly one DB call
+    assert delta("db_calls_per_request_sum", **route) == 1
+    assert delta("stage_duration_seconds_count", handler="get_analytics", stage="snapshot") == 1
+    assert "event_loop_lag_seconds_count" in after
+    assert sample(after, "openai_circuit_open") == 0
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+from supabase import create_client
+from app.main import app
+from benchmarks.fakes import FakePostgrest, ServerThread
+
+AUTH = ("admin", "changeme")
+
+@pytest.fixture(scope="module")
+def fake_db():
+    fake = FakePostgrest()
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    fake.seed("leads", [
+        {
+            "full_name": f"Lead {i}",
+            "email": f"lead{i}@example.com",
+            "score": i * 10,
+            "status": "sold" if i % 2 else "available",
+            "reasoning": "long text " * 50,
+            # Two leads share a timestamp to exercise the id tie-breaker
+            "created_at": (start + timedelta(minutes=min(i, 5))).isoformat(),
+        }
+        for i in range(7)
+    ])
+    with ServerThread(fake.app) as server:
+        with patch("app.routes.admin.supabase", create_client(server.url, "test-key")):
+            yield fake
+
+def test_keyset_pages_cover_every_lead_once(fake_db):
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/admin/leads", params=params, auth=AUTH).json()
+        seen += page["leads"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len({lead["id"] for lead in seen}) == 7
+    keys = [(lead["created_at"], lead["id"]) for lead in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert "reasoning" not in seen[0]
+
+def test_projection_and_filters(fake_db):
+    client = TestClient(app)
+    page = client.get(
+        "/admin/leads",
+        params={"fields": "full_name,score", "status": "sold", "min_score": 30},
+        auth=AUTH,
+    ).json()
+    assert sorted(lead["score"] for lead in page["leads"]) == [30, 50]
+    assert set(page["leads"][0]) == {"id", "created_at", "full_name", "score"}
+
+def test_rejects_bad_cursor_and_fields(fake_db):
+    client = TestClient(app)
+    assert client.get("/admin/leads", params={"cursor": "bogus"}, auth=AUTH).status_code == 400
+    assert client.get("/admin/leads", params={"fields": "password"}, auth=AUTH).status_code == 400
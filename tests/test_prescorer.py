@@ -0,0 +1,44 @@
+from datetime import date
+from app.models import RawLead
+from app.ai import prescorer
+from app.ai.prescorer import prescore, fast_path, parse_budget
+
+TODAY = date(2030, 1, 1)
+
+def make_lead(**overrides):
+    data = {
+        "full_name": "John Doe",
+        "email": "john@example.com",
+        "phone": "555-1234",
+        "move_date": "2030-01-10",
+        "origin_zip": "10001",
+        "destination_zip": "90210",
+        "home_size": "4 Bedroom House",
+        "budget": "$12,000",
+        "urgency": "ASAP",
+    }
+    data.update(overrides)
+    return RawLead(**data)
+
+def test_parse_budget():
+    assert parse_budget("$5,000") == 5000
+    assert parse_budget("5k") == 5000
+    assert parse_budget("3000-4000") == 3000
+    assert parse_budget("not sure") is None
+
+def test_junk_signals():
+    assert prescore(make_lead(move_date="2029-12-01"), TODAY)[0] == 5
+    assert prescore(make_lead(destination_zip="10001"), TODAY)[0] == 10
+    assert prescore(make_lead(budget=" "), TODAY)[0] == 10
+
+def test_hot_lead_scores_high():
+    score, reasoning = prescore(make_lead(), TODAY)
+    assert score >= 85
+    assert "4BR" in reasoning
+
+def test_fast_path_escalates_ambiguous_leads():
+    prescorer.stats.update(fast_path=0, escalated=0)
+    assert fast_path(make_lead(move_date="2020-01-01"))["score"] == 5
+    ambiguous = make_lead(move_date="2099-01-01", home_size="2BR", budget="4000", urgency="Medium")
+    assert fast_path(ambiguous) is None
+    assert prescorer.fast_path_stats()["escalation_rate"] == 0.5
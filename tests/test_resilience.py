@@ -0,0 +1,167 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.ai import scorer
+from app.ai.cache import score_cache
+from app.ai.resilience import CircuitBreaker, LatencyTracker, hedged
+from tests.test_cache import make_lead
+
+def test_breaker_opens_on_error_rate_and_recovers_via_probe():
+    breaker = CircuitBreaker(window=10, error_threshold=0.5, min_calls=4, cooldown=0.05)
+    for success in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(success)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()          # the single half-open probe
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["times_opened"] == 1
+
+def test_hedge_wins_over_slow_attempt():
+    delays = [1.0, 0.01]
+    cancelled = []
+
+    async def attempt():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    start = time.perf_counter()
+    assert asyncio.run(hedged(attempt, hedge_after=0.05, max_attempts=2)) == 0.01
+    assert time.perf_counter() - start < 0.5
+    assert cancelled == [1.0]
+
+def test_hedged_retries_only_retryable_errors():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert asyncio.run(hedged(flaky, hedge_after=None, max_attempts=3)) == "ok"
+    assert len(calls) == 2
+
+    fatal = AsyncMock(side_effect=ValueError("bad request"))
+    try:
+        asyncio.run(hedged(fatal, None, 3, retryable=lambda e: not isinstance(e, ValueError)))
+    except ValueError:
+        pass
+    assert fatal.await_count == 1
+
+def test_latency_percentiles():
+    tracker = LatencyTracker()
+    for ms in range(1, 101):
+        tracker.observe(ms / 1000)
+    assert tracker.percentiles() == {"count": 100, "p50_ms": 51.0, "p95_ms": 96.0, "p99_ms": 100.0}
+
+def test_slow_openai_hits_deadline_and_trips_breaker():
+    async def hang(**kwargs):
+        await asyncio.sleep(5)
+
+    score_cache.clear()
+    breaker = CircuitBreaker(window=4, error_threshold=0.5, min_calls=2, cooldown=60)
+    with patch.object(scorer, "client") as mock_openai, \
+            patch.object(scorer, "breaker", breaker), \
+            patch.object(scorer, "OPENAI_DEADLINE", 0.05), \
+            patch.object(scorer, "OPENAI_HEDGE_AFTER", 0.02):
+        mock_openai.chat.completions.create = AsyncMock(side_effect=hang)
+        start = time.perf_counter()
+        results = [asyncio.run(scorer.analyze_lead(make_lead(budget=str(5000 + i)))) for i in range(4)]
+        elapsed = time.perf_counter() - start
+
+        # Two deadline failures (original + hedge each) open the breaker;
+        # later leads never reach OpenAI
+        assert breaker.state == CircuitBreaker.OPEN
+        assert mock_openai.chat.completions.create.await_count == 4
+
+    assert elapsed < 1
+    assert all("rule-based estimate" in r["reasoning"] for r in results)
+    assert all(r["score"] == results[0]["score"] for r in results)
+    # Fallback scores are never cached
+    assert score_cache.stats()["size"] == 0
+
+def test_queueing_for_a_slot_is_not_an_upstream_timeout():
+    # Eight leads through one slot take ~8x the upstream latency, far past
+    # the deadline, yet each call is on time once it holds the slot
+    active = 0
+    peak = 0
+
+    async def slow(**kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        completion = MagicMock()
+        completion.choices[0].message.content = '{"score": 70, "reasoning": "ok"}'
+        return completion
+
+    score_cache.clear()
+    breaker = CircuitBreaker(window=4, error_threshold=0.5, min_calls=2, cooldown=60)
+    with patch.object(scorer, "client") as mock_openai, \
+            patch.object(scorer, "breaker", breaker), \
+            patch.object(scorer, "OPENAI_DEADLINE", 0.15), \
+            patch.object(scorer, "OPENAI_HEDGE_AFTER", 0.02):
+        mock_openai.chat.completions.create = AsyncMock(side_effect=slow)
+        leads = [make_lead(budget=str(5000 + i)) for i in range(8)]
+        results = asyncio.run(scorer.analyze_leads(leads, max_concurrency=1, pack_size=1))
+
+        assert [r["score"] for r in results] == [70] * 8
+        # No free slot, so no hedges either
+        assert mock_openai.chat.completions.create.await_count == 8
+    assert peak == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    score_cache.clear()
+
+def test_open_breaker_and_full_limiter_fail_fast_to_the_fallback():
+    limiter = scorer.limiter
+    open_breaker = CircuitBreaker(window=2, error_threshold=0.5, min_calls=1, cooldown=60)
+    open_breaker.record(False)
+
+    async def main():
+        for _ in range(limiter.max_concurrency):   # every slot busy
+            await limiter.acquire(0)
+        try:
+            tokens = limiter._tokens
+            start = time.perf_counter()
+            rejected = await asyncio.gather(*(scorer.analyze_lead(make_lead(budget=str(6000 + i))) for i in range(5)))
+            # Rejected calls never waited for a slot nor spent any budget
+            assert limiter._tokens >= tokens
+            with patch.object(scorer, "breaker", CircuitBreaker()):
+                queued = await scorer.analyze_lead(make_lead(budget="7000"))
+            return rejected, queued, time.perf_counter() - start
+        finally:
+            for _ in range(limiter.max_concurrency):
+                limiter.release()
+
+    score_cache.clear()
+    # A semaphore of its own: the process-wide one must not bind to this loop
+    with patch.object(scorer, "client") as mock_openai, \
+            patch.object(scorer, "breaker", open_breaker), \
+            patch.object(scorer, "OPENAI_QUEUE_TIMEOUT", 0.05), \
+            patch.object(limiter, "_semaphore", asyncio.Semaphore(limiter.max_concurrency)):
+        mock_openai.chat.completions.create = AsyncMock()
+        rejected, queued, elapsed = asyncio.run(main())
+        mock_openai.chat.completions.create.assert_not_awaited()
+
+    assert elapsed < 0.5
+    assert all("rule-based estimate" in r["reasoning"] for r in rejected + [queued])
+    assert score_cache.stats()["size"] == 0
+
+def test_rate_limited_calls_are_not_retried_at_once():
+    import httpx
+    import openai
+
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    assert not scorer._retryable(openai.RateLimitError("slow down", response=response, body=None))
+    assert scorer._retryable(openai.APIConnectionError(request=response.request))
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from supabase import create_client
+from app.main import app
+from app.services.routing import LeadRouter
+from benchmarks.fakes import FakePostgrest, ServerThread
+
+def sub(customer_id, tier, included, used=0, prefixes=None):
+    return {
+        "customer_id": customer_id, "tier": tier, "leads_included": included,
+        "leads_used": used, "service_zip_prefixes": prefixes,
+    }
+
+def lead(lead_id, origin, destination="99999"):
+    return {"id": lead_id, "origin_zip": origin, "destination_zip": destination}
+
+def test_higher_tier_in_area_wins_until_quota_runs_out():
+    router = LeadRouter([
+        sub("starter", "starter", 5, prefixes=["100"]),
+        sub("enterprise", "enterprise", 2, prefixes=["100", "902"]),
+    ])
+    assignments, unrouted = router.route([lead(f"l{i}", "10001") for i in range(8)])
+    winners = [a["customer_id"] for a in assignments]
+    assert winners == ["enterprise"] * 2 + ["starter"] * 5
+    assert unrouted == ["l7"]
+
+def test_destination_area_and_nationwide_fallback():
+    router = LeadRouter([
+        sub("la", "starter", 10, prefixes=["902"]),
+        sub("anywhere", "professional", 10),
+        sub("full", "enterprise", 10, used=10, prefixes=["100"]),
+    ])
+    assignments, unrouted = router.route([lead("a", "10001", "90210"), lead("b", "60601")])
+    assert assignments == [
+        {"lead_id": "a", "customer_id": "la"},
+        {"lead_id": "b", "customer_id": "anywhere"},
+    ]
+    assert unrouted == []
+
+def test_route_endpoint_commits_in_one_call():
+    fake = FakePostgrest()
+    fake.seed("customers", [
+        {"id": "11111111-1111-1111-1111-111111111111", "service_zip_prefixes": ["100"]},
+        {"id": "22222222-2222-2222-2222-222222222222", "service_zip_prefixes": ["902"]},
+    ])
+    fake.seed("subscriptions", [
+        {"customer_id": "11111111-1111-1111-1111-111111111111", "tier": "starter",
+         "status": "active", "leads_included": 1, "leads_used": 0},
+        {"customer_id": "22222222-2222-2222-2222-222222222222", "tier": "enterprise",
+         "status": "active", "leads_included": 5, "leads_used": 0},
+    ])
+    fake.seed("leads", [
+        {"origin_zip": "10001", "destination_zip": "30301", "score": 90, "status": "available"},
+        {"origin_zip": "10002", "destination_zip": "30301", "score": 80, "status": "available"},
+        {"origin_zip": "90210", "destination_zip": "30301", "score": 70, "status": "available"},
+    ])
+
+    with ServerThread(fake.app) as server, \
+         patch("app.routes.admin.supabase", create_client(server.url, "test-key")):
+        requests_before = fake.requests
+        response = TestClient(app).post("/admin/leads/route", json={}, auth=("admin", "changeme"))
+        assert fake.requests - requests_before == 4  # 3 reads + 1 bulk commit
+
+    data = response.json()
+    assert data["routed"] == 2
+    assert len(data["unrouted"]) == 1
+    assert sorted(l["status"] for l in fake.rows("leads")) == ["available", "sold", "sold"]
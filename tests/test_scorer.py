@@ -0,0 +1,62 @@
+import asyncio
+from unittest.mock import patch
+from openai import AsyncOpenAI
+from app.ai import scorer
+from app.ai.cache import score_cache
+from app.ai.scorer import analyze_leads, parse_packed
+from benchmarks.fakes import FakeOpenAI, ServerThread
+from tests.test_cache import make_lead
+
+def ambiguous_leads(n: int) -> list:
+    # Mid-range prescores, so every lead escalates past the fast path
+    return [make_lead(budget=str(5000 + i)) for i in range(n)]
+
+def run_with_fake(fake: FakeOpenAI, leads: list, pack_size: int) -> list:
+    score_cache.clear()
+    with ServerThread(fake.app) as server, \
+            patch.object(scorer, "client", AsyncOpenAI(base_url=f"{server.url}/v1", api_key="test")):
+        results = asyncio.run(analyze_leads(leads, pack_size=pack_size))
+    score_cache.clear()
+    return results
+
+def test_parse_packed_keeps_only_valid_entries():
+    content = (
+        '{"results": ['
+        '{"id": 0, "score": 71, "reasoning": "ok"},'
+        '{"id": "1", "score": 40.4, "reasoning": "string id"},'
+        '{"id": 0, "score": 10, "reasoning": "duplicate"},'
+        '{"id": 2, "score": 140, "reasoning": "out of range"},'
+        '{"id": 3, "score": 50},'
+        '{"id": 9, "score": 50, "reasoning": "unknown id"}'
+        ']}'
+    )
+    assert parse_packed(content, 4) == {
+        0: {"score": 71, "reasoning": "ok"},
+        1: {"score": 40, "reasoning": "string id"},
+    }
+    assert parse_packed("not json", 4) == {}
+    assert parse_packed('{"score": 80}', 4) == {}
+
+def test_packed_mode_sends_one_request_per_pack():
+    fake = FakeOpenAI()
+    leads = ambiguous_leads(12)
+    # Duplicate submission in the same batch is scored once
+    leads.append(make_lead(budget="5000", email="dup@example.com"))
+
+    packed = run_with_fake(fake, leads, pack_size=5)
+
+    assert fake.requests == 3
+    assert all(isinstance(r, dict) and 0 <= r["score"] <= 100 for r in packed)
+    assert packed[-1] == packed[0]
+
+def test_packed_mode_falls_back_per_lead_for_missing_results():
+    fake = FakeOpenAI()
+    fake.omit_ids = {1, 3}
+    leads = ambiguous_leads(5)
+
+    results = run_with_fake(fake, leads, pack_size=5)
+
+    # One packed request plus one individual request per omitted lead
+    assert fake.requests == 3
+    assert all(isinstance(r, dict) for r in results)
+    assert results[1]["reasoning"].startswith("Moderate value move")
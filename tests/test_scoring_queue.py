@@ -0,0 +1,78 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import RawLead
+from app.services.dedup import lead_index
+from app.services.scoring_queue import ScoringQueue
+from tests.test_api import insert_leads_rpc
+
+LEAD = {
+    "full_name": "John Doe",
+    "email": "john@example.com",
+    "phone": "555-1234",
+    "move_date": "2030-10-01",
+    "origin_zip": "10001",
+    "destination_zip": "90210",
+    "home_size": "2BR",
+    "budget": "5000",
+    "urgency": "High",
+}
+
+def test_journaled_jobs_survive_restart(tmp_path):
+    path = str(tmp_path / "queue.db")
+    ScoringQueue(path=path).journal("lead-1", RawLead(**LEAD))
+
+    restarted = ScoringQueue(path=path, workers=0)
+    jobs = restarted.durable.pending()
+    assert [job["lead_id"] for job in jobs] == ["lead-1"]
+    assert jobs[0]["payload"]["move_date"] == "2030-10-01"
+
+def test_workers_score_and_ack_jobs(tmp_path):
+    queue = ScoringQueue(path=str(tmp_path / "queue.db"), workers=2)
+    mock_supabase = MagicMock()
+
+    async def main():
+        await queue.start()
+        for i in range(3):
+            queue.enqueue(queue.journal(f"lead-{i}", RawLead(**LEAD)))
+        await queue._queue.join()
+        await queue.stop()
+
+    with patch("app.services.scoring_queue.analyze_lead", AsyncMock(return_value={"score": 77, "reasoning": "ok"})), \
+         patch("app.services.scoring_queue.supabase", mock_supabase):
+        asyncio.run(main())
+
+    assert queue.processed == 3
+    assert queue.durable.pending() == []
+    update = mock_supabase.table.return_value.update.call_args.args[0]
+    assert update == {"score": 77, "reasoning": "ok", "status": "available"}
+
+def test_ingest_returns_pending_lead(tmp_path):
+    queue = ScoringQueue(path=str(tmp_path / "queue.db"))
+    lead_index.clear()
+    with patch("app.routes.leads.scoring_queue", queue), \
+         patch("app.services.dedup.supabase") as mock_supabase:
+        mock_supabase.rpc.side_effect = insert_leads_rpc
+        response = TestClient(app).post("/leads/ingest", json=LEAD)
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "pending"
+    row = mock_supabase.rpc.call_args.args[1]["p_leads"][0]["row"]
+    assert row["id"] == data["id"] and row["status"] == "pending"
+    assert [job["lead_id"] for job in queue.durable.pending()] == [data["id"]]
+
+def test_start_claims_only_orphaned_jobs(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = ScoringQueue(path=path, workers=0)
+    for lead_id in ("ours", "live-worker", "dead-worker"):
+        queue.journal(lead_id, RawLead(**LEAD))
+    db = queue.durable._conn()
+    db.execute("UPDATE scoring_jobs SET owner = 1 WHERE lead_id = 'live-worker'")
+    db.execute("UPDATE scoring_jobs SET owner = 2147483600 WHERE lead_id = 'dead-worker'")
+
+    claimed = queue.durable.claim_orphans()
+
+    assert sorted(job["lead_id"] for job in claimed) == ["dead-worker", "ours"]
+    assert len(queue.durable.pending()) == 3
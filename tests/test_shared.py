@@ -0,0 +1,38 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from app.services.analytics import AnalyticsSnapshot
+from app.shared import Generations, per_worker
+
+def test_generations_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "shared.db")
+    worker_a, worker_b = Generations(path), Generations(path)
+
+    assert worker_a.get("analytics") == 0
+    assert worker_a.bump("analytics") == 1
+    assert worker_b.bump("analytics") == 2
+    assert worker_a.get("analytics") == 2
+
+def test_snapshot_reloads_after_another_worker_writes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    ours, theirs = AnalyticsSnapshot(ttl=3600), AnalyticsSnapshot(ttl=3600)
+    fetch = AsyncMock(return_value={"total_leads": 5, "available_leads": 5})
+
+    async def main():
+        await ours.get()
+        await ours.get()
+        theirs.lead_added()
+        return await ours.get()
+
+    with patch("app.services.analytics.generations", Generations(path)), \
+         patch("app.services.analytics.fetch_analytics", fetch):
+        asyncio.run(main())
+
+    assert ours.refreshes == 2
+    assert fetch.await_count == 2
+
+def test_per_worker_warns_when_the_budget_cannot_be_split(caplog):
+    with patch("app.shared.WEB_CONCURRENCY", 4):
+        assert per_worker(10) == 2
+        assert not caplog.records
+        assert per_worker(3) == 1
+    assert "less than one per worker" in caplog.text
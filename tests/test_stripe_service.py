@@ -0,0 +1,148 @@
+import json
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+import stripe
+from app.services import stripe_service
+from app.services.stripe_service import call_stripe, charge_overages
+
+def test_call_stripe_retries_transient_errors_with_same_key():
+    calls = []
+
+    def flaky(**params):
+        calls.append(params["idempotency_key"])
+        if len(calls) < 3:
+            raise stripe.APIConnectionError("connection reset")
+        return "ok"
+
+    with patch.object(stripe_service, "STRIPE_RETRY_BASE_DELAY", 0.001):
+        assert asyncio.run(call_stripe(flaky, email="a@b.com")) == "ok"
+    assert len(calls) == 3
+    assert len(set(calls)) == 1
+
+def test_call_stripe_does_not_retry_card_errors():
+    method = MagicMock(side_effect=stripe.CardError("declined", None, "card_declined"))
+    try:
+        asyncio.run(call_stripe(method, amount=100))
+    except stripe.CardError:
+        pass
+    assert method.call_count == 1
+
+def test_call_stripe_runs_off_event_loop():
+    seen = {}
+
+    def method(**params):
+        seen["thread"] = threading.current_thread().name
+        return "ok"
+
+    asyncio.run(call_stripe(method))
+    assert seen["thread"].startswith("stripe")
+
+def test_charge_overages_runs_concurrently():
+    def slow_create(**params):
+        time.sleep(0.1)
+        return MagicMock(id=f"pi_{params['customer']}")
+
+    charges = [
+        {"customer_id": f"cus_{i}", "num_leads": 2, "tier": "starter", "idempotency_key": f"k{i}"}
+        for i in range(5)
+    ]
+    with patch("stripe.PaymentIntent.create", side_effect=slow_create) as create:
+        start = time.perf_counter()
+        results = asyncio.run(charge_overages(charges))
+        elapsed = time.perf_counter() - start
+
+    assert [r["charge_id"] for r in results] == [f"pi_cus_{i}" for i in range(5)]
+    assert all(r["amount"] == 24 for r in results)
+    assert elapsed < 0.3
+    assert {c.kwargs["idempotency_key"] for c in create.call_args_list} == {f"k{i}" for i in range(5)}
+
+def _subscribe_many(n: int) -> list:
+    from app.services.stripe_service import create_subscription
+
+    async def run():
+        return await asyncio.gather(*(create_subscription(f"cus_{i}", "starter") for i in range(n)))
+
+    return asyncio.run(run())
+
+def test_subscriptions_reuse_cached_price(tmp_path):
+    from benchmarks.fakes import FakeStripe, ServerThread
+    from app.services.stripe_service import PriceCache, price_lookup_key
+
+    fake = FakeStripe(latency=0.05)
+    cache_path = str(tmp_path / "prices.json")
+    with ServerThread(fake.app) as server, \
+            patch.object(stripe, "api_base", server.url), \
+            patch.object(stripe, "api_key", "sk_test_fake"), \
+            patch.object(stripe_service, "price_cache", PriceCache(cache_path)):
+        start = time.perf_counter()
+        first = _subscribe_many(5)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        second = _subscribe_many(5)
+        warm = time.perf_counter() - start
+
+        # A restarted process picks the price up from disk without asking Stripe
+        with patch.object(stripe_service, "price_cache", PriceCache(cache_path)):
+            _subscribe_many(1)
+
+    assert all(r["success"] for r in first + second)
+    # One lookup and one create for the whole run, however many subscriptions
+    assert fake.calls["GET /v1/prices"] == 1
+    assert fake.calls["POST /v1/prices"] == 1
+    assert fake.calls["POST /v1/subscriptions"] == 11
+    price_id = fake.objects["price"][0]["id"]
+    assert {s["price"] for s in fake.objects["subscription"]} == {price_id}
+    [(cached_key, cached_id)] = json.load(open(cache_path)).items()
+    assert cached_key.startswith("test-") and cached_key.endswith(price_lookup_key("starter"))
+    assert cached_id == price_id
+    # Warm subscriptions skip the two price round-trips entirely
+    assert warm < cold
+
+def test_price_cache_finds_existing_price_by_lookup_key(tmp_path):
+    from benchmarks.fakes import FakeStripe, ServerThread
+    from app.services.stripe_service import PriceCache, price_lookup_key
+
+    fake = FakeStripe()
+    fake.objects["price"] = [{"id": "price_existing", "object": "price", "lookup_key": price_lookup_key("enterprise")}]
+    with ServerThread(fake.app) as server, \
+            patch.object(stripe, "api_base", server.url), \
+            patch.object(stripe, "api_key", "sk_test_fake"):
+        price_id = asyncio.run(PriceCache(str(tmp_path / "prices.json")).get("enterprise"))
+
+    assert price_id == "price_existing"
+    assert "POST /v1/prices" not in fake.calls
+
+def test_price_cache_is_per_account_and_recovers_from_missing_prices(tmp_path):
+    from benchmarks.fakes import FakeStripe, ServerThread
+    from app.services.stripe_service import PriceCache
+
+    cache_path = str(tmp_path / "prices.json")
+    old_account, new_account = FakeStripe(), FakeStripe()
+    cache = PriceCache(cache_path)
+    with patch.object(stripe_service, "price_cache", cache):
+        with ServerThread(old_account.app) as server, \
+                patch.object(stripe, "api_base", server.url), \
+                patch.object(stripe, "api_key", "sk_test_old"):
+            assert all(r["success"] for r in _subscribe_many(1))
+            old_price = old_account.objects["price"][0]["id"]
+
+        # Another account: nothing cached for it yet, so its own price is used
+        with ServerThread(new_account.app) as server, \
+                patch.object(stripe, "api_base", server.url), \
+                patch.object(stripe, "api_key", "sk_test_new"):
+            assert all(r["success"] for r in _subscribe_many(1))
+            new_price = new_account.objects["price"][0]["id"]
+            assert new_price != old_price
+
+            # The price is deleted in Stripe: the cached id is evicted and re-resolved
+            new_account.objects["price"].clear()
+            assert all(r["success"] for r in _subscribe_many(1))
+
+    assert new_account.calls["POST /v1/prices"] == 2
+    assert [s["price"] for s in new_account.objects["subscription"]] == [
+        new_price, new_account.objects["price"][0]["id"],
+    ]
+    assert len(json.load(open(cache_path))) == 2